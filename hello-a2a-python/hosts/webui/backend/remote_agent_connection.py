@@ -1,15 +1,18 @@
+import asyncio
 import json
 import logging
+import os
+import secrets
 import time
-import uuid
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Callable
+from typing import Callable, Protocol
 
 import httpx
+import orjson
 from a2a.client import A2AClient
 from a2a.types import (
     AgentCard,
-    JSONRPCErrorResponse,
     Message,
     MessageSendParams,
     SendMessageRequest,
@@ -22,47 +25,130 @@ from a2a.types import (
 # Setup logging
 logger = logging.getLogger(__name__)
 
-# Simple logging helper class for Remote Agent Connection
 
+class A2AJsonFormatter(logging.Formatter):
+    """将A2A流程记录序列化为单行JSON（orjson），供JSON日志收集端使用"""
 
-class RemoteAgentLogger:
-    """简洁的远程智能体连接日志记录器"""
+    def format(self, record: logging.LogRecord) -> str:
+        return orjson.dumps(
+            {"msg": record.getMessage(), **record.__dict__.get("a2a", {})}
+        ).decode()
 
-    @staticmethod
-    def generate_correlation_id() -> str:
-        return str(uuid.uuid4())
 
-    @staticmethod
-    def log_a2a_request(correlation_id: str, agent_name: str, message_id: str, streaming: bool = False):
-        """记录A2A请求"""
-        logger.info(
-            f"📡 A2A请求: {agent_name} | ID:{correlation_id[:8]} | 流式:{streaming}")
+# 按事件类型添加的表情前缀，默认为流程事件
+_EVENT_EMOJI = {
+    "a2a_request": "📡",
+    "a2a_complete": "✅",
+    "error_handling": "❌",
+}
 
-    @staticmethod
-    def log_a2a_response(correlation_id: str, agent_name: str, duration_ms: float, success: bool = True):
-        """记录A2A响应"""
-        status = "✅" if success else "❌"
-        logger.info(
-            f"{status} A2A响应: {agent_name} | ID:{correlation_id[:8]} | 耗时:{round(duration_ms, 2)}ms")
 
-    @staticmethod
-    def log_flow_event(correlation_id: str, event: str, agent_name: str, details: str = ""):
-        """记录A2A流程事件"""
-        logger.info(
-            f"🌐 A2A流程: {event} | {agent_name} | ID:{correlation_id[:8]} | {details}")
+class A2AEmojiFormatter(logging.Formatter):
+    """在格式化阶段按record的事件类型添加表情前缀，日志消息本身保持纯ASCII"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        formatted = super().format(record)
+        a2a = record.__dict__.get("a2a")
+        if a2a is None:
+            return formatted
+        return f"{_EVENT_EMOJI.get(a2a.get('event'), '🌐')} {formatted}"
+
+
+# Opt-in output formats for A2A flow records: A2A_LOG_JSON=1 or A2A_LOG_EMOJI=1
+if os.getenv("A2A_LOG_JSON") or os.getenv("A2A_LOG_EMOJI"):
+    _a2a_handler = logging.StreamHandler()
+    _a2a_handler.setFormatter(
+        A2AJsonFormatter() if os.getenv("A2A_LOG_JSON")
+        else A2AEmojiFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    logger.addHandler(_a2a_handler)
+    logger.propagate = False
+
+# Simple logging helpers for Remote Agent Connection
+
+
+@dataclass(slots=True)
+class _LogCtx:
+    """单次send_message调用的日志上下文"""
+    cid8: str
+    agent: str
+    t0: int
+
+
+def generate_correlation_id() -> str:
+    return secrets.token_hex(4)
+
+
+def log_a2a_request(ctx: _LogCtx, message_id: str, streaming: bool = False):
+    """记录A2A请求"""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info(
+        "A2A_REQ agent=%s cid=%s stream=%s", ctx.agent, ctx.cid8, streaming,
+        extra={"a2a": {"cid": ctx.cid8, "agent": ctx.agent,
+                       "event": "a2a_request", "stream": streaming}})
+
+
+def log_flow_event(ctx: _LogCtx, event: str, details: str = ""):
+    """记录A2A流程事件"""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info(
+        "A2A_FLOW event=%s agent=%s cid=%s %s", event, ctx.agent, ctx.cid8, details,
+        extra={"a2a": {"cid": ctx.cid8, "agent": ctx.agent,
+                       "event": event, "details": details}})
+
+
+def log_complete(ctx: _LogCtx, kind: str, details: str = "", **fields):
+    """记录A2A完成（响应与流程完成合并为一条记录）
+
+    fields为附加的结构化字段，以key=value形式追加到消息中，并写入a2a记录。
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    duration_ms = (time.perf_counter_ns() - ctx.t0) // 1_000_000
+    fmt = "A2A_DONE agent=%s cid=%s dur_ms=%d kind=%s"
+    args = [ctx.agent, ctx.cid8, duration_ms, kind]
+    for key, value in fields.items():
+        fmt += f" {key}=%s"
+        args.append(value)
+    if details:
+        fmt += " %s"
+        args.append(details)
+    logger.info(fmt, *args,
+                extra={"a2a": {"cid": ctx.cid8, "agent": ctx.agent,
+                               "dur_ms": duration_ms, "event": "a2a_complete",
+                               "kind": kind, "details": details, **fields}})
 
 
 TaskCallbackArg = Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
+_TASK_UPDATE_TYPES = (Task, TaskStatusUpdateEvent, TaskArtifactUpdateEvent)
 TaskUpdateCallback = Callable[[TaskCallbackArg, AgentCard], Task]
 
 
+class BatchTaskUpdateCallback(Protocol):
+    """可选的批量回调：流式更新按批次交付，而不是逐条调用"""
+
+    def __call__(self, task: TaskCallbackArg, agent_card: AgentCard) -> Task: ...
+
+    def batch(self, tasks: list[TaskCallbackArg], agent_card: AgentCard) -> Task: ...
+
+
+# Flush buffered streaming updates after this many events, or this many
+# seconds after the first buffered one even if the stream goes quiet
+_CALLBACK_BATCH_SIZE = 16
+_CALLBACK_FLUSH_DELAY = 0.02
+
+
 class RemoteAgentConnections:
     """持有远程智能体连接的类"""
 
+    __slots__ = ("agent_client", "card", "_agent_name", "_supports_streaming")
+
     def __init__(self, client: httpx.AsyncClient, agent_card: AgentCard):
         self.agent_client = A2AClient(client, agent_card)
         self.card = agent_card
-        self.pending_tasks = set()
+        self._agent_name = agent_card.name
+        self._supports_streaming = bool(agent_card.capabilities.streaming)
 
     def get_agent(self) -> AgentCard:
         return self.card
@@ -90,167 +176,186 @@ class RemoteAgentConnections:
         Returns:
             Task for async operations or Message for immediate responses
         """
+        _req = log_a2a_request
+        _flow = log_flow_event
+        _done = log_complete
+
         # Generate correlation ID for this A2A communication
-        correlation_id = RemoteAgentLogger.generate_correlation_id()
-        start_time = time.time()
+        correlation_id = generate_correlation_id()
+        ctx = _LogCtx(cid8=correlation_id,
+                      agent=self._agent_name, t0=time.perf_counter_ns())
+        _info_enabled = logger.isEnabledFor(logging.INFO)
 
         # Log A2A communication start
-        RemoteAgentLogger.log_flow_event(
-            correlation_id=correlation_id,
+        _flow(
+            ctx,
             event="a2a_communication",
-            agent_name=self.card.name,
-            details=f"操作:send_message,目标:{self.card.name}"
+            details=f"操作:send_message,目标:{self._agent_name}"
         )
 
         # Check if agent supports streaming
-        if self.card.capabilities.streaming:
+        if self._supports_streaming:
             # Log streaming request
-            RemoteAgentLogger.log_a2a_request(
-                correlation_id=correlation_id,
-                agent_name=self.card.name,
+            _req(
+                ctx,
                 message_id=request.message.messageId,
                 streaming=True
             )
 
             task = None
             response_count = 0
-            async for response in self.agent_client.send_message_streaming(
-                SendStreamingMessageRequest(params=request)
-            ):
-                response_count += 1
-
-                # Check for errors in the response
-                if isinstance(response.root, JSONRPCErrorResponse):
-                    RemoteAgentLogger.log_flow_event(
-                        correlation_id=correlation_id,
-                        event="error_handling",
-                        agent_name=self.card.name,
-                        details="处理错误"
-                    )
-                    return None
-
-                # Get the event from successful response
-                if hasattr(response.root, 'result') and response.root.result:
-                    event = response.root.result
-
-                    # Handle immediate message response (end of streaming)
-                    if isinstance(event, Message):
-                        duration_ms = (time.time() - start_time) * 1000
-
-                        RemoteAgentLogger.log_a2a_response(
-                            correlation_id=correlation_id,
-                            agent_name=self.card.name,
-                            duration_ms=duration_ms,
-                            success=True
-                        )
-
-                        RemoteAgentLogger.log_flow_event(
-                            correlation_id=correlation_id,
-                            event="flow_completion",
-                            agent_name=self.card.name,
-                            details=f"streaming_message_completed, response_count: {response_count}, duration_ms: {duration_ms}"
+            batch_callback = getattr(task_callback, 'batch', None)
+            buf: list[TaskCallbackArg] = []
+            flusher: asyncio.Task | None = None
+
+            def _flush():
+                # 交付缓冲的更新：达到批量上限、定时交付或流结束时触发
+                nonlocal buf, task
+                if buf:
+                    task = batch_callback(buf, self.card)
+                    buf = []
+
+            async def _flush_later():
+                # 远程智能体可能长时间无新事件，定时交付以免UI看不到进度
+                await asyncio.sleep(_CALLBACK_FLUSH_DELAY)
+                _flush()
+
+            def _settle():
+                # 收回定时交付任务（回调抛出的异常在此重新抛给调用方），再交付剩余更新
+                nonlocal flusher
+                if flusher is not None:
+                    if flusher.done():
+                        flusher.result()
+                    else:
+                        flusher.cancel()
+                    flusher = None
+                _flush()
+
+            try:
+                async for response in self.agent_client.send_message_streaming(
+                    SendStreamingMessageRequest.model_construct(
+                        id=correlation_id, params=request)
+                ):
+                    response_count += 1
+
+                    # Check for errors in the response (only error responses carry `error`)
+                    if getattr(response.root, "error", None) is not None:
+                        _settle()
+                        _flow(
+                            ctx,
+                            event="error_handling",
+                            details="处理错误"
                         )
-
-                        return event
-
-                    # Handle task update events during streaming
-                    if task_callback and event:
-                        task = task_callback(event, self.card)
-
-            duration_ms = (time.time() - start_time) * 1000
+                        return None
+
+                    # Get the event from successful response
+                    if hasattr(response.root, 'result') and response.root.result:
+                        event = response.root.result
+
+                        # Without a callback, intermediate task updates are dropped
+                        if task_callback is None and not isinstance(event, Message):
+                            continue
+
+                        # Handle immediate message response (end of streaming)
+                        if isinstance(event, Message):
+                            _settle()
+
+                            if _info_enabled:
+                                _done(
+                                    ctx,
+                                    "streaming_message_completed",
+                                    f"response_count: {response_count}"
+                                )
+
+                            return event
+
+                        # Handle task update events during streaming
+                        if batch_callback is None:
+                            task = task_callback(event, self.card)
+                            continue
+
+                        buf.append(event)
+                        if flusher is not None and flusher.done():
+                            # 上一次定时交付已完成，检查其结果后再安排下一次
+                            flusher.result()
+                            flusher = None
+                        if len(buf) >= _CALLBACK_BATCH_SIZE:
+                            _settle()
+                        elif flusher is None:
+                            flusher = asyncio.create_task(_flush_later())
+
+                _settle()
+            finally:
+                if flusher is not None:
+                    flusher.cancel()
 
             # Log streaming completion with task
-            if task:
-                RemoteAgentLogger.log_a2a_response(
-                    correlation_id=correlation_id,
-                    agent_name=self.card.name,
-                    duration_ms=duration_ms,
-                    success=True
+            if _info_enabled:
+                _done(
+                    ctx,
+                    "streaming_task_completed",
+                    response_count=response_count,
+                    task_id=task.id if task else None,
                 )
 
-            RemoteAgentLogger.log_flow_event(
-                correlation_id=correlation_id,
-                event="flow_completion",
-                agent_name=self.card.name,
-                details=f"streaming_task_completed, response_count: {response_count}, duration_ms: {duration_ms}, task_id: {task.id if task else None}"
-            )
-
             return task
 
         else:  # Non-streaming mode
             # Log non-streaming request
-            RemoteAgentLogger.log_a2a_request(
-                correlation_id=correlation_id,
-                agent_name=self.card.name,
+            _req(
+                ctx,
                 message_id=request.message.messageId,
                 streaming=False
             )
 
             response = await self.agent_client.send_message(
-                SendMessageRequest(params=request)
+                SendMessageRequest.model_construct(
+                    id=correlation_id, params=request)
             )
 
-            duration_ms = (time.time() - start_time) * 1000
-
             # Handle error responses
-            if isinstance(response.root, JSONRPCErrorResponse):
-                error_details = {
-                    "error": "Non-streaming request failed",
-                    "duration_ms": duration_ms
-                }
-
-                RemoteAgentLogger.log_flow_event(
-                    correlation_id=correlation_id,
-                    event="error_handling",
-                    agent_name=self.card.name,
-                    details=f"Non-streaming request failed, duration_ms: {duration_ms}"
-                )
+            if getattr(response.root, "error", None) is not None:
+                if _info_enabled:
+                    duration_ms = (
+                        time.perf_counter_ns() - ctx.t0) // 1_000_000
+                    _flow(
+                        ctx,
+                        event="error_handling",
+                        details=f"Non-streaming request failed, duration_ms: {duration_ms}"
+                    )
 
                 return None
 
+            result = getattr(response.root, 'result', None)
+            if result is None:
+                return None
+
             # Handle immediate message responses
-            if hasattr(response.root, 'result') and isinstance(response.root.result, Message):
-                message = response.root.result
+            if isinstance(result, Message):
+                message = result
 
                 # Log non-streaming message response
-                RemoteAgentLogger.log_a2a_response(
-                    correlation_id=correlation_id,
-                    agent_name=self.card.name,
-                    duration_ms=duration_ms,
-                    success=True
-                )
-
-                RemoteAgentLogger.log_flow_event(
-                    correlation_id=correlation_id,
-                    event="flow_completion",
-                    agent_name=self.card.name,
-                    details=f"non_streaming_message_completed, duration_ms: {duration_ms}, message_id: {message.messageId}"
-                )
+                if _info_enabled:
+                    _done(
+                        ctx,
+                        "non_streaming_message_completed",
+                        f"message_id: {message.messageId}"
+                    )
 
                 return message
 
             # Handle task-based responses
-            if hasattr(response.root, 'result'):
-                task = response.root.result
-
-                # Log non-streaming task response
-                RemoteAgentLogger.log_a2a_response(
-                    correlation_id=correlation_id,
-                    agent_name=self.card.name,
-                    duration_ms=duration_ms,
-                    success=True
-                )
+            task = result
 
-                if task_callback and isinstance(task, (Task, TaskStatusUpdateEvent, TaskArtifactUpdateEvent)):
-                    task_callback(task, self.card)
+            if task_callback and isinstance(task, _TASK_UPDATE_TYPES):
+                task_callback(task, self.card)
 
-                RemoteAgentLogger.log_flow_event(
-                    correlation_id=correlation_id,
-                    event="flow_completion",
-                    agent_name=self.card.name,
-                    details=f"non_streaming_task_completed, duration_ms: {duration_ms}, task_id: {getattr(task, 'id', 'unknown')}"
+            # Log non-streaming task response
+            if _info_enabled:
+                _done(
+                    ctx,
+                    "non_streaming_task_completed",
+                    f"task_id: {getattr(task, 'id', 'unknown')}"
                 )
 
-                return task
-
-            return None
+            return task
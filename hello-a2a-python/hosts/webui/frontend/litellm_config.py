@@ -2,32 +2,89 @@
 This file configures the litellm client to use local LLM through Ollama
 """
 
+import time
+
+from dataclasses import asdict, dataclass, field
+from types import MappingProxyType
+
+
 # Configuration for Ollama-based local LLM
-config = {
-    "model": "ollama_chat/qwen3:0.6b",
-    "api_base": "http://localhost:11434/v1",
-    "api_key": "sk-ollama-local",  # placeholder, not required for Ollama
-    "format": "chat",
-    "additional_kwargs": {
+@dataclass(frozen=True, slots=True)
+class LiteLLMConfig:
+    model: str = "ollama_chat/qwen3:0.6b"
+    api_base: str = "http://localhost:11434/v1"
+    api_key: str = "sk-ollama-local"  # placeholder, not required for Ollama
+    format: str = "chat"
+    additional_kwargs: dict = field(default_factory=lambda: {
         "force_json": True,
         "message_formatter": "string"  # This ensures content is passed as string
-    }
-}
+    })
+
+
+config = LiteLLMConfig()
+# Read-only mapping view for consumers that expect a dict
+config_dict = MappingProxyType(asdict(config))
+
+OLLAMA_BASE_URL = "http://localhost:11434"
+# How long a health check result is reused before probing Ollama again.
+# A "down" result expires quickly so a freshly started Ollama is noticed soon.
+OLLAMA_CHECK_TTL_SECONDS = 30.0
+OLLAMA_CHECK_FAILURE_TTL_SECONDS = 2.0
+
+_client = None
+_async_client = None
+# (expiry time, result) of the last health check, shared by both variants
+_last_check: tuple[float, bool] | None = None
+
+
+def _cache_entry(now: float, available: bool) -> tuple[float, bool]:
+    ttl = (OLLAMA_CHECK_TTL_SECONDS if available
+           else OLLAMA_CHECK_FAILURE_TTL_SECONDS)
+    return now + ttl, available
+
 
 # Verify if Ollama service is available
 def check_ollama_service() -> bool:
-    """Check if Ollama service is available"""
+    """Check if Ollama service is available (cached for OLLAMA_CHECK_TTL_SECONDS)"""
+    global _client, _last_check
+    now = time.monotonic()
+    if _last_check and now < _last_check[0]:
+        return _last_check[1]
+
+    import httpx
+    if _client is None:
+        _client = httpx.Client(base_url=OLLAMA_BASE_URL, timeout=2.0)
+    try:
+        response = _client.get("/api/version")
+        available = response.status_code == 200
+    except Exception:
+        available = False
+    _last_check = _cache_entry(now, available)
+    return available
+
+
+async def check_ollama_service_async() -> bool:
+    """Async variant of check_ollama_service that does not block the event loop"""
+    global _async_client, _last_check
+    now = time.monotonic()
+    if _last_check and now < _last_check[0]:
+        return _last_check[1]
+
     import httpx
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(base_url=OLLAMA_BASE_URL, timeout=2.0)
     try:
-        response = httpx.get("http://localhost:11434/api/version", timeout=2.0)
-        return response.status_code == 200
+        response = await _async_client.get("/api/version")
+        available = response.status_code == 200
     except Exception:
-        return False
+        available = False
+    _last_check = _cache_entry(now, available)
+    return available
 
 if __name__ == "__main__":
     # When running this script directly, verify Ollama service
     if check_ollama_service():
         print("✅ Ollama service is running")
     else:
-        print("❌ Ollama service is not available at http://localhost:11434")
+        print(f"❌ Ollama service is not available at {OLLAMA_BASE_URL}")
         print("Please install and start Ollama: https://ollama.com/download")
@@ -1,12 +1,17 @@
 import base64
-import datetime
-import json
+import bisect
+import binascii
 import logging
 import os
+import re
+import secrets
+import sys
 import time
-import uuid
+from dataclasses import dataclass
+from typing import Any
 
 import httpx
+import orjson
 
 from a2a.types import (
     AgentCard,
@@ -27,8 +32,6 @@ from a2a.types import (
 )
 from google.adk import Runner
 from google.adk.artifacts import InMemoryArtifactService
-from google.adk.events.event import Event as ADKEvent
-from google.adk.events.event_actions import EventActions as ADKEventActions
 from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
 from google.adk.sessions.in_memory_session_service import InMemorySessionService
 from google.genai import types
@@ -36,83 +39,159 @@ from hosts.webui.backend.host_agent import HostAgent
 from hosts.webui.backend.remote_agent_connection import (
     TaskCallbackArg,
 )
-from utils.agent_card import get_agent_card
+from utils.agent_card import get_agent_card_async
 
-from service.server.application_manager import ApplicationManager
+from service.server.application_manager import MAX_EVENTS, ApplicationManager
 from service.types import Conversation, Event
 
 
 # 简化日志配置
 logger = logging.getLogger(__name__)
 
+# task_callback的最大递归深度，以及同时跟踪的任务数上限
+_MAX_CALLBACK_DEPTH = 5
+_MAX_TRACKED_CALLBACKS = 10_000
+
+# 仍处于活动状态的任务状态
+_OPEN_STATES = frozenset(
+    {TaskState.submitted, TaskState.working, TaskState.input_required})
+
+
+@dataclass(slots=True)
+class _PendingArtifact:
+    """流式制品在组装期间的轻量缓冲，仅在最后一个分块到达时生成Artifact"""
+    artifact_id: str
+    name: str | None
+    description: str | None
+    metadata: dict[str, Any] | None
+    parts: list[Part]
+
+    def to_artifact(self) -> Artifact:
+        return Artifact(
+            artifactId=self.artifact_id,
+            name=self.name,
+            description=self.description,
+            metadata=self.metadata,
+            parts=self.parts,
+        )
+
+
+class _UUIDPool:
+    """按4KiB批量读取os.urandom，切片生成32位十六进制ID，摊薄每次的系统调用开销
+
+    这些ID只在本地作为不透明键使用，从不按UUID解析，因此跳过UUID对象构造和连字符格式化。
+    """
+    __slots__ = ('buf', 'off')
+
+    _BLOCK = 4096
+
+    def __init__(self):
+        self.buf = os.urandom(self._BLOCK)
+        self.off = 0
+
+    def next(self) -> str:
+        off = self.off
+        if off + 16 > self._BLOCK:
+            self.buf = os.urandom(self._BLOCK)
+            off = 0
+        self.off = off + 16
+        return self.buf[off:off + 16].hex()
+
+
+_uuid_pool = _UUIDPool()
+
+
+class _BatchingTaskCallback:
+    """交给HostAgent的任务回调，流式更新按批次交付给管理器
+
+    满足BatchTaskUpdateCallback协议：单条更新走task_callback，批量更新走task_callback_batch。
+    """
+    __slots__ = ('_manager',)
+
+    def __init__(self, manager: 'ADKHostManager'):
+        self._manager = manager
+
+    def __call__(self, task: TaskCallbackArg, agent_card: AgentCard) -> Task:
+        return self._manager.task_callback(task, agent_card)
+
+    def batch(self, tasks: list[TaskCallbackArg], agent_card: AgentCard) -> Task:
+        return self._manager.task_callback_batch(tasks, agent_card)
+
+# 从send_message工具调用中提取智能体名称
+_AGENT_NAME_RE = re.compile(r'agent_name["\s:]+([^",\s]+)')
+
 
 class WebUIFlowLogger:
     """简洁的WebUI流程日志记录器"""
 
     @staticmethod
     def generate_correlation_id() -> str:
-        return str(uuid.uuid4())
+        return secrets.token_hex(16)
 
     @staticmethod
-    def log_user_request(correlation_id: str, message_id: str, context_id: str, message_length: int):
+    def short_id(cid: str) -> str:
+        """日志中使用的关联ID短格式"""
+        return cid[:8]
+
+    @staticmethod
+    def log_user_request(correlation_id: str, message_id: str, context_id: str, message_length: int, short_id: str | None = None):
         """记录用户请求"""
-        logger.info(
-            f"👤 用户请求: ID:{correlation_id[:8]} | 上下文:{context_id[:8]} | 长度:{message_length}")
+        logger.info("👤 用户请求: ID:%s | 上下文:%s | 长度:%s",
+                    short_id or correlation_id[:8], context_id[:8], message_length)
 
     @staticmethod
-    def log_llm_analysis_start(correlation_id: str, context_id: str, agent_count: int):
+    def log_llm_analysis_start(correlation_id: str, context_id: str, agent_count: int, short_id: str | None = None):
         """记录分析开始"""
-        logger.info(f"🧠 分析开始: ID:{correlation_id[:8]} | 智能体:{agent_count}个")
+        logger.info("🧠 分析开始: ID:%s | 智能体:%s个", short_id or correlation_id[:8], agent_count)
 
     @staticmethod
-    def log_agent_selection(correlation_id: str, selected_agent: str, reasoning: str = ""):
+    def log_agent_selection(correlation_id: str, selected_agent: str, reasoning: str = "", short_id: str | None = None):
         """记录智能体选择"""
-        logger.info(f"🎯 智能体选择: {selected_agent} | ID:{correlation_id[:8]}")
+        logger.info("🎯 智能体选择: %s | ID:%s", selected_agent, short_id or correlation_id[:8])
 
     @staticmethod
-    def log_remote_agent_request(correlation_id: str, agent_name: str, message_length: int):
+    def log_remote_agent_request(correlation_id: str, agent_name: str, message_length: int, short_id: str | None = None):
         """记录远程智能体请求"""
-        logger.info(
-            f"📤 远程请求: {agent_name} | ID:{correlation_id[:8]} | 长度:{message_length}")
+        logger.info("📤 远程请求: %s | ID:%s | 长度:%s",
+                    agent_name, short_id or correlation_id[:8], message_length)
 
     @staticmethod
-    def log_remote_agent_response(correlation_id: str, agent_name: str, duration_ms: float, success: bool = True):
+    def log_remote_agent_response(correlation_id: str, agent_name: str, duration_ms: float, success: bool = True, short_id: str | None = None):
         """记录远程智能体响应"""
-        status = "✅" if success else "❌"
-        logger.info(
-            f"{status} 远程响应: {agent_name} | ID:{correlation_id[:8]} | 耗时:{round(duration_ms, 2)}ms")
+        logger.info("%s 远程响应: %s | ID:%s | 耗时:%.2fms", "✅" if success else "❌",
+                    agent_name, short_id or correlation_id[:8], duration_ms)
 
     @staticmethod
-    def log_final_response(correlation_id: str, response_length: int):
+    def log_final_response(correlation_id: str, response_length: int, short_id: str | None = None):
         """记录最终响应"""
-        logger.info(f"🎉 最终响应: ID:{correlation_id[:8]} | 长度:{response_length}")
+        logger.info("🎉 最终响应: ID:%s | 长度:%s", short_id or correlation_id[:8], response_length)
 
     @staticmethod
-    def log_flow_event(correlation_id: str, event: str, details: str = ""):
+    def log_flow_event(correlation_id: str, event: str, details: str = "", short_id: str | None = None):
         """记录流程事件"""
-        logger.info(f"🔄 流程事件: {event} | ID:{correlation_id[:8]} | {details}")
+        logger.info("🔄 流程事件: %s | ID:%s | %s", event, short_id or correlation_id[:8], details)
 
 
 class LLMInteractionLogger:
     """简洁的大模型交互日志记录器"""
 
     @staticmethod
-    def log_llm_prompt(correlation_id: str, prompt_length: int, model: str = "gemini"):
+    def log_llm_prompt(correlation_id: str, prompt_length: int, model: str = "gemini", short_id: str | None = None):
         """记录大模型请求"""
-        logger.info(
-            f"🤖 大模型输入: {model} | ID:{correlation_id[:8]} | 长度:{prompt_length}")
+        logger.info("🤖 大模型输入: %s | ID:%s | 长度:%s",
+                    model, short_id or correlation_id[:8], prompt_length)
 
     @staticmethod
-    def log_llm_response(correlation_id: str, response_length: int, duration_ms: float, model: str = "gemini"):
+    def log_llm_response(correlation_id: str, response_length: int, duration_ms: float, model: str = "gemini", short_id: str | None = None):
         """记录大模型响应"""
-        logger.info(
-            f"✅ 大模型输出: {model} | ID:{correlation_id[:8]} | 耗时:{round(duration_ms, 2)}ms | 长度:{response_length}")
+        logger.info("✅ 大模型输出: %s | ID:%s | 耗时:%.2fms | 长度:%s",
+                    model, short_id or correlation_id[:8], duration_ms, response_length)
 
     @staticmethod
-    def log_tool_execution(correlation_id: str, tool_name: str, duration_ms: float = 0):
+    def log_tool_execution(correlation_id: str, tool_name: str, duration_ms: float = 0, short_id: str | None = None):
         """记录工具执行"""
-        logger.info(
-            f"🔧 工具执行: {tool_name} | ID:{correlation_id[:8]} | 耗时:{round(duration_ms, 2)}ms")
+        logger.info("🔧 工具执行: %s | ID:%s | 耗时:%.2fms",
+                    tool_name, short_id or correlation_id[:8], duration_ms)
 
 
 class ADKHostManager(ApplicationManager):
@@ -139,16 +218,27 @@ class ADKHostManager(ApplicationManager):
         uses_vertex_ai: bool = False,
     ):
         self._conversations: list[Conversation] = []
+        # conversation id -> conversation, for O(1) lookups
+        self._conversations_by_id: dict[str, Conversation] = {}
         self._messages: list[Message] = []
         self._tasks: list[Task] = []
+        # task id -> task / position in self._tasks, for O(1) lookups
+        self._tasks_by_id: dict[str, Task] = {}
+        self._task_index: dict[str, int] = {}
+        # task id -> (history list, its length, message ids in it)
+        self._task_history_ids: dict[str, tuple[list[Message], int, set[str]]] = {}
         self._events: dict[str, Event] = {}
-        self._pending_message_ids: list[str] = []
+        # the same events kept ordered by timestamp for the events property
+        self._events_sorted: list[Event] = []
+        # 有序的待处理消息ID（dict保持插入顺序，增删均为O(1)）
+        self._pending_message_ids: dict[str, None] = {}
         self._agents: list[AgentCard] = []
-        self._artifact_chunks: dict[str, list[Artifact]] = {}
+        # artifact id -> in-progress streamed artifact being assembled
+        self._artifact_chunks: dict[str, _PendingArtifact] = {}
         self._session_service = InMemorySessionService()
         self._artifact_service = InMemoryArtifactService()
         self._memory_service = InMemoryMemoryService()
-        self._host_agent = HostAgent(http_client, self.task_callback)
+        self._host_agent = HostAgent(http_client, _BatchingTaskCallback(self))
         self._context_to_conversation: dict[str, str] = {}
         self.user_id = 'test_user'
         self.app_name = 'A2A'
@@ -158,9 +248,19 @@ class ADKHostManager(ApplicationManager):
             or os.environ.get('GOOGLE_GENAI_USE_VERTEXAI', '').upper() == 'TRUE'
         )
 
-        # 添加循环检测机制
-        self._processing_tasks = set()  # 正在处理的任务ID集合
-        self._callback_depth = {}  # 每个任务的回调深度计数器
+        # 添加循环检测机制：存在即表示正在处理，值为回调深度
+        self._callback_depth: dict[str, int] = {}
+        # 按回调参数的具体类型分派处理函数
+        self._cb_handlers = {
+            TaskStatusUpdateEvent: self._cb_status,
+            TaskArtifactUpdateEvent: self._cb_artifact,
+            Task: self._cb_task,
+        }
+        self._emit_handlers = {
+            TaskStatusUpdateEvent: self._emit_status,
+            TaskArtifactUpdateEvent: self._emit_artifact,
+            Task: self._emit_task,
+        }
 
         # Set environment variables based on auth method
         if self.uses_vertex_ai:
@@ -171,7 +271,8 @@ class ADKHostManager(ApplicationManager):
             os.environ['GOOGLE_GENAI_USE_VERTEXAI'] = 'FALSE'
             os.environ['GOOGLE_API_KEY'] = self.api_key
 
-        self._initialize_host()
+        # Host runner is built lazily on first use and rebuilt only when marked dirty
+        self._host_dirty = True
 
         # Map of message id to task id
         self._task_map: dict[str, str] = {}
@@ -189,6 +290,7 @@ class ADKHostManager(ApplicationManager):
             session_service=self._session_service,
             memory_service=self._memory_service,
         )
+        self._host_dirty = False
 
     async def create_conversation(self) -> Conversation:
         session = await self._session_service.create_session(
@@ -197,6 +299,8 @@ class ADKHostManager(ApplicationManager):
         conversation_id = session.id
         c = Conversation(conversation_id=conversation_id, is_active=True)
         self._conversations.append(c)
+        self._conversations_by_id[conversation_id] = c
+        self._version += 1
         return c
 
     def update_api_key(self, api_key: str):
@@ -207,8 +311,8 @@ class ADKHostManager(ApplicationManager):
             # Only update if not using Vertex AI
             if not self.uses_vertex_ai:
                 os.environ['GOOGLE_API_KEY'] = api_key
-                # Reinitialize host with new API key
-                self._initialize_host()
+                # Reinitialize host with new API key on next use
+                self._host_dirty = True
 
                 # Map of message id to task id
                 self._task_map = {}
@@ -223,50 +327,49 @@ class ADKHostManager(ApplicationManager):
         3. Check for open tasks that should be continued
         4. Attach task ID to message if task continuation is needed
         """
-        print(f"[ADKHostManager] 🧹 Sanitizing message: {message.messageId}")
-
-        if message.contextId:
-            print(
-                f"[ADKHostManager] 🔍 Looking up conversation for context: {message.contextId}")
-            conversation = self.get_conversation(message.contextId)
-            if not conversation:
-                print(
-                    f"[ADKHostManager] ⚠️ No conversation found for context: {message.contextId}")
-                return message
-
-            print(
-                f"[ADKHostManager] ✅ Conversation found with {len(conversation.messages)} messages")
-
-            # Check if the last message in conversation was tied to an open task
-            if conversation.messages:
-                last_message = conversation.messages[-1]
-                task_id = last_message.taskId
-
-                if task_id:
-                    print(
-                        f"[ADKHostManager] 🔍 Checking if task {task_id} is still open")
-
-                    # Find the task and check if it's still open
-                    task = next(
-                        filter(lambda x: x and x.id == task_id, self._tasks),
-                        None,
-                    )
-
-                    if task_still_open(task):
-                        print(
-                            f"[ADKHostManager] 🔄 Task {task_id} is still open, attaching to current message")
-                        message.taskId = task_id
-                    else:
-                        print(
-                            f"[ADKHostManager] ✅ Task {task_id} is closed, message starts new context")
+        # 新对话没有上下文ID，无需检查
+        if not message.contextId:
+            return message
+
+        logger.debug("[ADKHostManager] 🧹 Sanitizing message: %s", message.messageId)
+
+        logger.debug(
+            "[ADKHostManager] 🔍 Looking up conversation for context: %s", message.contextId)
+        conversation = self.get_conversation(message.contextId)
+        if not conversation:
+            logger.debug(
+                "[ADKHostManager] ⚠️ No conversation found for context: %s", message.contextId)
+            return message
+
+        logger.debug(
+            "[ADKHostManager] ✅ Conversation found with %s messages", len(conversation.messages))
+
+        # Check if the last message in conversation was tied to an open task
+        if conversation.messages:
+            last_message = conversation.messages[-1]
+            task_id = last_message.taskId
+
+            if task_id:
+                logger.debug(
+                    "[ADKHostManager] 🔍 Checking if task %s is still open", task_id)
+
+                # Find the task and check if it's still open
+                task = self._tasks_by_id.get(task_id)
+
+                if task_still_open(task):
+                    logger.debug(
+                        "[ADKHostManager] 🔄 Task %s is still open, attaching to current message", task_id)
+                    message.taskId = task_id
                 else:
-                    print("[ADKHostManager] ℹ️ Last message had no task ID")
+                    logger.debug(
+                        "[ADKHostManager] ✅ Task %s is closed, message starts new context", task_id)
             else:
-                print("[ADKHostManager] ℹ️ Conversation has no previous messages")
+                logger.debug("[ADKHostManager] ℹ️ Last message had no task ID")
         else:
-            print("[ADKHostManager] ℹ️ Message has no context ID")
+            logger.debug(
+                "[ADKHostManager] ℹ️ Conversation has no previous messages")
 
-        print("[ADKHostManager] ✅ Message sanitization completed")
+        logger.debug("[ADKHostManager] ✅ Message sanitization completed")
         return message
 
     async def process_message(self, message: Message, correlation_id: str | None = None):
@@ -284,90 +387,90 @@ class ADKHostManager(ApplicationManager):
         # Use provided correlation ID or generate a new one for tracking this entire request flow
         if correlation_id is None:
             correlation_id = WebUIFlowLogger.generate_correlation_id()
+        short_id = WebUIFlowLogger.short_id(correlation_id)
         flow_start_time = time.time()
 
-        print(
-            f"[ADKHostManager] 🎯 Starting message processing - ID: {message.messageId}, Correlation: {correlation_id}")
+        logger.debug(
+            "[ADKHostManager] 🎯 Starting message processing - ID: %s, Correlation: %s", message.messageId, correlation_id)
 
-        # Log the incoming user request
-        user_message_text = ""
-        if message.parts:
-            for part in message.parts:
-                if part.root.kind == 'text' and hasattr(part.root, 'text') and part.root.text is not None:
-                    user_message_text += part.root.text + " "
+        # Log the incoming user request (only the text length is needed)
+        message_length = sum(
+            len(p.root.text) for p in (message.parts or ())
+            if getattr(p.root, 'kind', None) == 'text'
+            and getattr(p.root, 'text', None)
+        )
 
         WebUIFlowLogger.log_user_request(
             correlation_id=correlation_id,
+            short_id=short_id,
             message_id=message.messageId,
             context_id=message.contextId or "",
-            message_length=len(user_message_text.strip())
+            message_length=message_length
         )
 
         message_id = message.messageId
         if message_id:
-            self._pending_message_ids.append(message_id)
-            print(
-                f"[ADKHostManager] 📝 Added message to pending queue: {message_id}")
+            message_id = sys.intern(message_id)
+            self._pending_message_ids[message_id] = None
+            logger.debug(
+                "[ADKHostManager] 📝 Added message to pending queue: %s", message_id)
 
         context_id = message.contextId
         if not context_id:
-            print("[ADKHostManager] ❌ Message context_id is required but missing")
+            logger.error(
+                "[ADKHostManager] ❌ Message context_id is required but missing")
             raise ValueError("Message context_id is required")
 
-        print(
-            f"[ADKHostManager] 🔍 Processing message for context: {context_id}")
+        logger.debug(
+            "[ADKHostManager] 🔍 Processing message for context: %s", context_id)
 
         # Get or create conversation context
         conversation = self.get_conversation(context_id)
-        print(
-            f"[ADKHostManager] 💬 Conversation context: {'Found' if conversation else 'Not found'}")
+        logger.debug(
+            "[ADKHostManager] 💬 Conversation context: %s", 'Found' if conversation else 'Not found')
 
         # Log LLM analysis start with available agents
-        available_agents = [
-            {"name": card.name, "description": card.description} for card in self._agents]
-        conversation_length = len(conversation.messages) if conversation else 0
-
         WebUIFlowLogger.log_llm_analysis_start(
             correlation_id=correlation_id,
+            short_id=short_id,
             context_id=context_id,
-            agent_count=len(available_agents)
+            agent_count=len(self._agents)
         )
 
         # 将消息存储到对话历史中
         self._messages.append(message)
         if conversation:
             conversation.messages.append(message)
-            print("[ADKHostManager] 📚 消息已添加到对话历史")
+            self._version += 1
+            logger.debug("[ADKHostManager] 📚 消息已添加到对话历史")
 
         # 为用户消息创建事件
         self.add_event(
             Event(
-                id=str(uuid.uuid4()),
+                id=_uuid_pool.next(),
                 actor='user',
                 content=message,
-                timestamp=datetime.datetime.utcnow().timestamp(),
+                timestamp=time.time(),
             )
         )
-        print("[ADKHostManager] 📊 用户消息事件已创建")
+        logger.debug("[ADKHostManager] 📊 用户消息事件已创建")
 
         final_event = None
 
         # 获取ADK处理所需的会话
-        print(
-            f"[ADKHostManager] 🔐 正在获取上下文会话: {context_id}")
+        logger.debug("[ADKHostManager] 🔐 正在获取上下文会话: %s", context_id)
         session = await self._session_service.get_session(
             app_name='A2A', user_id='test_user', session_id=context_id
         )
         if not session:
-            print(
-                f"[ADKHostManager] ❌ 未找到对应的会话 context_id: {context_id}")
+            logger.error("[ADKHostManager] ❌ 未找到对应的会话 context_id: %s", context_id)
             raise ValueError(f"Session not found for context_id: {context_id}")
 
-        print("[ADKHostManager] ✅ 会话获取成功")
+        logger.debug("[ADKHostManager] ✅ 会话获取成功")
 
         task_id = message.taskId
-        print(
-            f"[ADKHostManager] 🎯 任务ID: {task_id if task_id else '无任务ID(新任务)'}")
+        logger.debug(
+            "[ADKHostManager] 🎯 任务ID: %s", task_id if task_id else '无任务ID(新任务)')
 
         # 用当前消息上下文和关联ID更新会话状态
         state_update = {
@@ -376,83 +479,80 @@ class ADKHostManager(ApplicationManager):
             'message_id': message.messageId,
             'correlation_id': correlation_id,  # 跨流程追踪关联
         }
-        print(f"[ADKHostManager] 🔄 正在更新会话状态: {state_update}")
-
-        # 将状态更新事件添加到会话中
-        await self._session_service.append_event(
-            session,
-            ADKEvent(
-                id=ADKEvent.new_id(),
-                author='host_agent',
-                invocation_id=ADKEvent.new_id(),
-                actions=ADKEventActions(state_delta=state_update),
-            ),
-        )
-        print("[ADKHostManager] 📝 会话状态已更新")
+        # 状态更新通过run_async的state_delta随用户消息事件一并写入会话，
+        # 省去单独一次append_event
+        logger.debug("[ADKHostManager] 🔄 正在更新会话状态: %s", state_update)
 
         # 通过ADK主机智能体处理消息(这是核心AI协调处理)
-        print("[ADKHostManager] 🤖 开始ADK主机智能体处理...")
-        print("[ADKHostManager] 🧠 正在将消息转换为ADK格式进行大模型处理")
+        logger.debug("[ADKHostManager] 🤖 开始ADK主机智能体处理...")
+        logger.debug("[ADKHostManager] 🧠 正在将消息转换为ADK格式进行大模型处理")
+
+        if self._host_dirty:
+            self._initialize_host()
 
         llm_start_time = time.time()
+        # 事件分类仅用于INFO级别日志，日志关闭时整体跳过
+        _info_enabled = logger.isEnabledFor(logging.INFO)
         async for event in self._host_runner.run_async(
             user_id=self.user_id,
             session_id=context_id,
             new_message=self.adk_content_from_message(message),
+            state_delta=state_update,
         ):
             # 记录主机智能体的每个事件
-            if event.content:
-                event_text = ""
+            if _info_enabled and event.content:
                 # 安全提取ADK事件中的文本内容
-                if hasattr(event.content, 'parts') and event.content.parts:
-                    for part in event.content.parts:
-                        if hasattr(part, 'text') and part.text:
-                            event_text += part.text + " "
+                texts = []
+                for part in getattr(event.content, 'parts', None) or ():
+                    text = getattr(part, 'text', None)
+                    if text:
+                        texts.append(text)
+                event_text = " ".join(texts)
 
                 # 记录大模型交互(捕获工具调用和响应)
                 if event.author == 'host_agent' and event_text.strip():
                     llm_duration = (time.time() - llm_start_time) * 1000
 
                     # 检查这是否是工具调用或响应
-                    if 'send_message' in event_text or 'list_remote_agents' in event_text:
+                    has_send = 'send_message' in event_text
+                    has_list = 'list_remote_agents' in event_text
+                    if has_send or has_list:
                         # 这像是工具调用 - 尽可能提取智能体名称
                         agent_name = "unknown"
-                        if 'send_message' in event_text:
+                        if has_send:
                             # 尝试从工具调用中提取智能体名称
-                            import re
-                            agent_match = re.search(
-                                r'agent_name["\s:]+([^",\s]+)', event_text)
+                            agent_match = _AGENT_NAME_RE.search(event_text)
                             if agent_match:
                                 agent_name = agent_match.group(1)
 
                         WebUIFlowLogger.log_agent_selection(
                             correlation_id=correlation_id,
+                            short_id=short_id,
                             selected_agent=agent_name,
                             reasoning=event_text[:500]
                         )
 
                         LLMInteractionLogger.log_tool_execution(
                             correlation_id=correlation_id,
-                            tool_name="send_message" if "send_message" in event_text else "list_remote_agents",
+                            short_id=short_id,
+                            tool_name="send_message" if has_send else "list_remote_agents",
                             duration_ms=llm_duration
                         )
                     else:
                         # 常规大模型响应
                         LLMInteractionLogger.log_llm_response(
                             correlation_id=correlation_id,
+                            short_id=short_id,
                             response_length=len(event_text),
                             duration_ms=llm_duration,
                             model="ADK_Host_Agent"
                         )
 
-            # 如果事件中存在任务ID则更新
-            if (
-                event.actions.state_delta
-                and 'task_id' in event.actions.state_delta
-            ):
-                task_id = str(
-                    event.actions.state_delta['task_id']) if event.actions.state_delta['task_id'] is not None else None
-                # print(f"[ADKHostManager] 🎯 从事件更新任务ID: {task_id}")
+            # 如果事件中存在任务ID则更新（循环结束后即为最终事件的任务ID）
+            state_delta = event.actions.state_delta
+            if state_delta and 'task_id' in state_delta:
+                new_task_id = state_delta['task_id']
+                task_id = str(new_task_id) if new_task_id is not None else None
 
             # 如果存在事件内容则处理
             if event.content:
@@ -470,46 +570,44 @@ class ADKHostManager(ApplicationManager):
                 # print(f"[ADKHostManager] ✅ 事件内容已处理并存储")
             final_event = event
 
-        print("[ADKHostManager] 🏁 主机智能体处理完成")
+        logger.debug("[ADKHostManager] 🏁 主机智能体处理完成")
 
         # 生成最终响应消息
         response: Message | None = None
         if final_event:
-            print("[ADKHostManager] 📝 正在从主机智能体输出生成最终响应")
-
-            # 从最终事件更新任务ID
-            if (
-                final_event.actions.state_delta
-                and 'task_id' in final_event.actions.state_delta
-            ):
-                task_id = str(
-                    final_event.actions.state_delta['task_id']) if final_event.actions.state_delta['task_id'] is not None else None
-                print(f"[ADKHostManager] 🎯 Final task ID: {task_id}")
+            logger.debug("[ADKHostManager] 📝 正在从主机智能体输出生成最终响应")
+            logger.debug("[ADKHostManager] 🎯 Final task ID: %s", task_id)
 
             # Convert final event content to response message
             if final_event.content:
                 final_event.content.role = 'model'
-                response = await self.adk_content_to_message(
+                response, response_length = await self._adk_content_to_message(
                     final_event.content, context_id, task_id
                 )
                 self._messages.append(response)
-                print(
-                    f"[ADKHostManager] ✅ Final response message created: {response.messageId}")
+                logger.debug(
+                    "[ADKHostManager] ✅ Final response message created: %s", response.messageId)
+                WebUIFlowLogger.log_final_response(
+                    correlation_id=correlation_id,
+                    short_id=short_id,
+                    response_length=response_length,
+                )
 
         # Add response to conversation history
         if conversation and response:
             conversation.messages.append(response)
-            print("[ADKHostManager] 📚 Response added to conversation history")
-            print(
-                f"[ADKHostManager] 📊 Conversation now has {len(conversation.messages)} total messages")
+            self._version += 1
+            logger.debug("[ADKHostManager] 📚 Response added to conversation history")
+            logger.debug(
+                "[ADKHostManager] 📊 Conversation now has %s total messages", len(conversation.messages))
 
         # Remove message from pending queue
         if message_id:
-            self._pending_message_ids.remove(message_id)
-            print(
-                f"[ADKHostManager] ✅ Message removed from pending queue: {message_id}")
-            print(
-                f"[ADKHostManager] 📋 Pending queue now has {len(self._pending_message_ids)} messages")
+            self._pending_message_ids.pop(message_id, None)
+            logger.debug(
+                "[ADKHostManager] ✅ Message removed from pending queue: %s", message_id)
+            logger.debug(
+                "[ADKHostManager] 📋 Pending queue now has %s messages", len(self._pending_message_ids))
 
         # print(f"[ADKHostManager] 🎉 Message processing completed successfully")
         # print(f"[ADKHostManager] 📡 Processing complete - UI will detect changes via polling")
@@ -517,13 +615,20 @@ class ADKHostManager(ApplicationManager):
         # print(f"[ADKHostManager] ⏰ UI polling will discover: updated conversation, empty queue, new events")
 
     def add_task(self, task: Task):
+        # 驻留任务ID，使后续字典查找可以走引用相等的快速路径
+        task.id = sys.intern(task.id)
+        self._task_index[task.id] = len(self._tasks)
+        self._tasks_by_id[task.id] = task
         self._tasks.append(task)
+        self._version += 1
 
     def update_task(self, task: Task):
-        for i, t in enumerate(self._tasks):
-            if t.id == task.id:
-                self._tasks[i] = task
-                return
+        i = self._task_index.get(task.id)
+        if i is None:
+            return
+        self._tasks[i] = task
+        self._tasks_by_id[task.id] = task
+        self._version += 1
 
     def task_callback(self, task: TaskCallbackArg, agent_card: AgentCard):
         """Handle task callback events from remote agents.
@@ -540,16 +645,19 @@ class ADKHostManager(ApplicationManager):
             task: Task update event (Task, TaskStatusUpdateEvent, or TaskArtifactUpdateEvent)
             agent_card: The agent card of the remote agent sending the update
         """
-        # print(f"[ADKHostManager] 📞 Task callback received from remote agent: {agent_card.name}")
-        # print(f"[ADKHostManager] 🔍 Task event type: {type(task).__name__}")
-
-        # Log the task ID using defensive property access
-        task_id = getattr(task, 'id', getattr(task, 'taskId', 'unknown'))
-        # print(f"[ADKHostManager] 🎯 Task ID: {task_id}")
-
-        # 循环检测：防止同一任务的递归调用
-        if task_id in self._processing_tasks:
-            print(f"[ADKHostManager] ⚠️ 检测到循环调用，跳过任务: {task_id}")
+        handler = self._cb_handlers.get(type(task))
+        if handler is None:
+            logger.error("[ADKHostManager] ❌ Unexpected task type: %s", type(task))
+            # This shouldn't happen if TaskCallbackArg is properly typed
+            raise ValueError(f"Unexpected task type: {type(task)}")
+        # Task携带id，状态/制品更新事件携带taskId
+        task_id = task.id if type(task) is Task else task.taskId
+
+        # 循环检测：检查回调深度，防止同一任务的深度递归
+        depth = self._callback_depth.get(task_id, 0)
+        if depth > _MAX_CALLBACK_DEPTH:
+            logger.warning(
+                "[ADKHostManager] ⚠️ 回调深度过深 (%s)，跳过任务: %s", depth, task_id)
             # 返回一个基本任务而不是None以满足类型要求
             context_id = getattr(task, 'contextId', None) or 'unknown'
             return Task(
@@ -559,86 +667,61 @@ class ADKHostManager(ApplicationManager):
                 contextId=context_id,
             )
 
-        # 检查回调深度，防止深度递归
-        current_depth = self._callback_depth.get(task_id, 0)
-        if current_depth > 5:  # 最大深度限制
-            print(
-                f"[ADKHostManager] ⚠️ 回调深度过深 ({current_depth})，跳过任务: {task_id}")
-            # 清理深度计数器
-            self._callback_depth[task_id] = 0
-            # 返回一个基本任务以满足类型要求
-            context_id = getattr(task, 'contextId', None) or 'unknown'
-            return Task(
-                id=task_id,
-                status=TaskStatus(state=TaskState.submitted),
-                artifacts=[],
-                contextId=context_id,
-            )
-
-        # 标记任务正在处理
-        self._processing_tasks.add(task_id)
-        self._callback_depth[task_id] = current_depth + 1
+        # 标记任务正在处理（达到跟踪上限时不再登记新任务，避免无界增长）
+        tracked = depth > 0 or len(self._callback_depth) < _MAX_TRACKED_CALLBACKS
+        if tracked:
+            self._callback_depth[task_id] = depth + 1
 
         try:
             # Create UI event for task update first
-            # print(f"[ADKHostManager] 📡 Creating UI event for task update")
-            # print(f"[ADKHostManager] 📡 Emitting UI event for task update")
-            # print(f"[ADKHostManager] 🤖 Agent: {agent_card.name}")
-            # print(f"[ADKHostManager] 📊 Task type: {type(task).__name__}")
-            # print(f"[ADKHostManager] 🎯 Context ID: {context_id}")
-            self.emit_event(task, agent_card)
-
-            # Handle different types of task events
-            if isinstance(task, TaskStatusUpdateEvent):
-                # print(f"[ADKHostManager] 📊 Processing task status update event")
-                current_task = self.add_or_get_task(task)
-                current_task.status = task.status
-                # print(f"[ADKHostManager] 🔄 Updated task status: {task.status.state}")
-
-                self.attach_message_to_task(
-                    task.status.message, current_task.id)
-                self.insert_message_history(current_task, task.status.message)
-                self.update_task(current_task)
-                # print(f"[ADKHostManager] ✅ Task status update completed")
-                return current_task
+            self._emit(task, task_id, agent_card)
+            return handler(task)
+        finally:
+            # 回调可能原地修改了任务状态、历史或制品
+            self._version += 1
+            # 递减回调深度，回到0时清理计数器
+            if tracked:
+                d = self._callback_depth.get(task_id, 0) - 1
+                if d <= 0:
+                    self._callback_depth.pop(task_id, None)
+                else:
+                    self._callback_depth[task_id] = d
 
-            if isinstance(task, TaskArtifactUpdateEvent):
-                # print(f"[ADKHostManager] 📎 Processing task artifact update event")
-                current_task = self.add_or_get_task(task)
-                self.process_artifact_event(current_task, task)
-                self.update_task(current_task)
-                # print(f"[ADKHostManager] ✅ Task artifact update completed")
-                return current_task
+    def task_callback_batch(
+        self, tasks: list[TaskCallbackArg], agent_card: AgentCard
+    ) -> Task:
+        """Apply a batch of streamed task updates in arrival order.
 
-            # Handle new or updated Task objects
-            if isinstance(task, Task) and not any(filter(lambda x: isinstance(x, Task) and x.id == task.id, self._tasks)):
-                # print(f"[ADKHostManager] 🆕 Processing new task")
-                self.attach_message_to_task(task.status.message, task.id)
-                self.add_task(task)
-                # print(f"[ADKHostManager] ✅ New task added successfully")
-                return task
-
-            if isinstance(task, Task):
-                # print(f"[ADKHostManager] 🔄 Processing existing task update")
-                self.attach_message_to_task(task.status.message, task.id)
-                self.update_task(task)
-                # print(f"[ADKHostManager] ✅ Existing task updated successfully")
-                return task
-
-            print(f"[ADKHostManager] ❌ Unexpected task type: {type(task)}")
-            # This shouldn't happen if TaskCallbackArg is properly typed
-            raise ValueError(f"Unexpected task type: {type(task)}")
+        Returns the task produced by the last update, like task_callback.
+        """
+        task = None
+        for t in tasks:
+            task = self.task_callback(t, agent_card)
+        return task
+
+    def _cb_status(self, task: TaskStatusUpdateEvent) -> Task:
+        current_task = self.add_or_get_task(task)
+        current_task.status = task.status
+        self.attach_message_to_task(task.status.message, current_task.id)
+        self.insert_message_history(current_task, task.status.message)
+        self.update_task(current_task)
+        return current_task
 
-        finally:
-            # 清理处理标记
-            self._processing_tasks.discard(task_id)
-            # 递减回调深度
-            if task_id in self._callback_depth:
-                self._callback_depth[task_id] = max(
-                    0, self._callback_depth[task_id] - 1)
-                # 如果深度回到0，清理计数器
-                if self._callback_depth[task_id] == 0:
-                    del self._callback_depth[task_id]
+    def _cb_artifact(self, task: TaskArtifactUpdateEvent) -> Task:
+        current_task = self.add_or_get_task(task)
+        self.process_artifact_event(current_task, task)
+        self.update_task(current_task)
+        return current_task
+
+    def _cb_task(self, task: Task) -> Task:
+        self.attach_message_to_task(task.status.message, task.id)
+        if task.id not in self._tasks_by_id:
+            # 新任务
+            self.add_task(task)
+        else:
+            # 已有任务的更新
+            self.update_task(task)
+        return task
 
     def emit_event(self, task: TaskCallbackArg, agent_card: AgentCard):
         """Emit UI event for task updates from remote agents.
@@ -654,106 +737,75 @@ class ADKHostManager(ApplicationManager):
             task: Task update from remote agent
             agent_card: Agent card of the remote agent sending the update
         """
-        # print(f"[ADKHostManager] 📡 Emitting UI event for task update")
-        # print(f"[ADKHostManager] 🤖 Agent: {agent_card.name}")
-        # print(f"[ADKHostManager] 📊 Task type: {type(task)}")
-
-        content = None
-        context_id = task.contextId
-        # print(f"[ADKHostManager] 🎯 Context ID: {context_id}")
+        if type(task) not in self._emit_handlers:
+            raise ValueError(f"Unexpected task type: {type(task)}")
+        task_id = task.id if type(task) is Task else task.taskId
+        self._emit(task, task_id, agent_card)
 
-        # Handle TaskStatusUpdateEvent
-        if isinstance(task, TaskStatusUpdateEvent):
-            # print(f"[ADKHostManager] 📈 Processing TaskStatusUpdateEvent")
-            # print(f"[ADKHostManager] 🔄 Task status: {task.status.state}")
+    def _emit(self, task: TaskCallbackArg, task_id: str, agent_card: AgentCard):
+        content = self._emit_handlers[type(task)](task, task_id)
 
-            if task.status.message:
-                content = task.status.message
-                # print(f"[ADKHostManager] 💬 Using status message as content")
-            else:
-                # Create message from status state
-                content = Message(
-                    parts=[Part(root=TextPart(text=str(task.status.state)))],
-                    role=Role.agent,
-                    messageId=str(uuid.uuid4()),
-                    contextId=context_id,
-                    taskId=getattr(task, 'id', getattr(
-                        task, 'taskId', 'unknown')),
+        # Store event if content was created
+        if content:
+            self.add_event(
+                Event(
+                    id=_uuid_pool.next(),
+                    actor=agent_card.name,
+                    content=content,
+                    timestamp=time.time(),
                 )
-                # print(f"[ADKHostManager] 📝 Created message from status state: {task.status.state}")
+            )
 
-        # Handle TaskArtifactUpdateEvent
-        elif isinstance(task, TaskArtifactUpdateEvent):
-            # print(f"[ADKHostManager] 📎 Processing TaskArtifactUpdateEvent")
-            # print(f"[ADKHostManager] 🗂️ Artifact has {len(task.artifact.parts)} parts")
+    def _status_message(self, task: TaskCallbackArg, task_id: str) -> Message:
+        # Create message from status state
+        return Message(
+            parts=[Part(root=TextPart(text=str(task.status.state)))],
+            role=Role.agent,
+            messageId=_uuid_pool.next(),
+            contextId=task.contextId,
+            taskId=task_id,
+        )
 
-            content = Message(
-                parts=task.artifact.parts,
-                role=Role.agent,
-                messageId=str(uuid.uuid4()),
-                contextId=context_id,
-                taskId=getattr(task, 'id', getattr(task, 'taskId', 'unknown')),
-            )
-            # print(f"[ADKHostManager] 📄 Created message from artifact parts")
+    def _emit_status(self, task: TaskStatusUpdateEvent, task_id: str) -> Message:
+        # Handle TaskStatusUpdateEvent
+        return task.status.message or self._status_message(task, task_id)
 
+    def _emit_artifact(
+        self, task: TaskArtifactUpdateEvent, task_id: str
+    ) -> Message:
+        # Handle TaskArtifactUpdateEvent
+        return Message(
+            parts=task.artifact.parts,
+            role=Role.agent,
+            messageId=_uuid_pool.next(),
+            contextId=task.contextId,
+            taskId=task_id,
+        )
+
+    def _emit_task(self, task: Task, task_id: str) -> Message:
         # Handle Task object with status and message
-        elif task.status and task.status.message:
-            # print(f"[ADKHostManager] 📋 Processing Task with status message")
-            # print(f"[ADKHostManager] 🔄 Task status: {task.status.state}")
-            content = task.status.message
-            # print(f"[ADKHostManager] 💬 Using task status message as content")
+        if task.status and task.status.message:
+            return task.status.message
 
         # Handle Task object with artifacts
-        elif task.artifacts:
-            # print(f"[ADKHostManager] 🗃️ Processing Task with {len(task.artifacts)} artifacts")
+        if task.artifacts:
             parts = []
-            for i, a in enumerate(task.artifacts):
+            for a in task.artifacts:
                 parts.extend(a.parts)
-                # print(f"[ADKHostManager] 📎 Added {len(a.parts)} parts from artifact {i+1}")
-
-            content = Message(
+            return Message(
                 parts=parts,
                 role=Role.agent,
-                messageId=str(uuid.uuid4()),
-                taskId=task.id,
-                contextId=context_id,
+                messageId=_uuid_pool.next(),
+                taskId=task_id,
+                contextId=task.contextId,
             )
-            # print(f"[ADKHostManager] 📄 Created message from {len(parts)} total artifact parts")
 
         # Fallback: create message from task status
-        else:
-            # print(f"[ADKHostManager] ⚠️ Fallback: creating message from task status")
-            content = Message(
-                parts=[Part(root=TextPart(text=str(task.status.state)))],
-                role=Role.agent,
-                messageId=str(uuid.uuid4()),
-                taskId=task.id,
-                contextId=context_id,
-            )
-            # print(f"[ADKHostManager] 📝 Created fallback message with status: {task.status.state}")
-
-        # Store event if content was created
-        if content:
-            event_id = str(uuid.uuid4())
-            # print(f"[ADKHostManager] 💾 Storing UI event: {event_id}")
-
-            self.add_event(
-                Event(
-                    id=event_id,
-                    actor=agent_card.name,
-                    content=content,
-                    timestamp=datetime.datetime.utcnow().timestamp(),
-                )
-            )
-            # print(f"[ADKHostManager] ✅ UI event emitted successfully")
-            # print(f"[ADKHostManager] 📊 Total events: {len(self._events)}")
-        else:
-            # print(f"[ADKHostManager] ❌ No content created for event emission")
-            pass
+        return self._status_message(task, task_id)
 
     def attach_message_to_task(self, message: Message | None, task_id: str):
         if message:
-            self._task_map[message.messageId] = task_id
+            self._task_map[sys.intern(message.messageId)] = sys.intern(task_id)
 
     def insert_message_history(self, task: Task, message: Message | None):
         if not message:
@@ -763,46 +815,50 @@ class ADKHostManager(ApplicationManager):
         message_id = message.messageId
         if not message_id:
             return
-        if task.history and (
-            task.status.message
-            and task.status.message.messageId
-            not in [x.messageId for x in task.history]
-        ):
-            task.history.append(task.status.message)
-        elif not task.history and task.status.message:
-            task.history = [task.status.message]
-        else:
-            print(
-                'Message id already in history',
-                task.status.message.messageId if task.status.message else '',
-                task.history,
-            )
+        status_message = task.status.message
+        if not status_message:
+            return
+        if not task.history:
+            task.history = [status_message]
+            return
+        ids = self._history_ids(task)
+        if status_message.messageId in ids:
+            logger.debug(
+                "[ADKHostManager] Message id already in history: %s",
+                status_message.messageId)
+            return
+        ids.add(status_message.messageId)
+        task.history.append(status_message)
+        self._task_history_ids[task.id] = (task.history, len(task.history), ids)
+
+    def _history_ids(self, task: Task) -> set[str]:
+        """Message ids in task.history, cached until the history list changes."""
+        history = task.history
+        cached = self._task_history_ids.get(task.id)
+        if cached and cached[0] is history and cached[1] == len(history):
+            return cached[2]
+        ids = {m.messageId for m in history}
+        self._task_history_ids[task.id] = (history, len(history), ids)
+        return ids
 
     def add_or_get_task(self, event: TaskCallbackArg):
-        task_id = None
-        if isinstance(event, Message):
-            task_id = event.taskId
-        elif isinstance(event, Task):
-            task_id = event.id
+        # Task携带id，Message和状态/制品更新事件携带taskId
+        task_id = event.id if type(event) is Task else event.taskId
+        if task_id:
+            current_task = self._tasks_by_id.get(task_id)
+            if current_task is not None:
+                return current_task
         else:
-            task_id = event.taskId
-        if not task_id:
-            task_id = str(uuid.uuid4())
-        current_task = next(
-            filter(lambda x: x.id == task_id, self._tasks), None
+            task_id = _uuid_pool.next()
+
+        current_task = Task(
+            id=task_id,
+            # initialize with submitted
+            status=TaskStatus(state=TaskState.submitted),
+            artifacts=[],
+            contextId=event.contextId,
         )
-        if not current_task:
-            context_id = event.contextId
-            current_task = Task(
-                id=task_id,
-                # initialize with submitted
-                status=TaskStatus(state=TaskState.submitted),
-                artifacts=[],
-                contextId=context_id,
-            )
-            self.add_task(current_task)
-            return current_task
-
+        self.add_task(current_task)
         return current_task
 
     def process_artifact_event(
@@ -822,126 +878,128 @@ class ADKHostManager(ApplicationManager):
             task_update_event: The artifact update event from remote agent
         """
         artifact = task_update_event.artifact
-        print("[ADKHostManager] 📎 Processing artifact event")
-        print(f"[ADKHostManager] 🆔 Artifact ID: {artifact.artifactId}")
-        print(
-            f"[ADKHostManager] 📄 Artifact name: {artifact.name or 'unnamed'}")
-        print(f"[ADKHostManager] 📊 Artifact parts: {len(artifact.parts)}")
-        print(f"[ADKHostManager] ➕ Append mode: {task_update_event.append}")
-        print(f"[ADKHostManager] 🏁 Last chunk: {task_update_event.lastChunk}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "[ADKHostManager] 📎 Processing artifact event - ID: %s, name: %s, "
+                "parts: %s, append: %s, last chunk: %s",
+                artifact.artifactId, artifact.name or 'unnamed', len(artifact.parts),
+                task_update_event.append, task_update_event.lastChunk)
 
         if not task_update_event.append:
-            print("[ADKHostManager] 🔄 Processing non-append artifact (replace mode)")
+            logger.debug(
+                "[ADKHostManager] 🔄 Processing non-append artifact (replace mode)")
 
             # Received the first chunk or entire payload for an artifact
             if (
                 task_update_event.lastChunk is None
                 or task_update_event.lastChunk
             ):
-                print(
+                logger.debug(
                     "[ADKHostManager] ✅ Complete artifact received - adding to task")
 
                 # Complete artifact - add directly to task
                 if not current_task.artifacts:
                     current_task.artifacts = []
                 current_task.artifacts.append(artifact)
-                print(
-                    f"[ADKHostManager] 📋 Task now has {len(current_task.artifacts)} artifacts")
+                logger.debug(
+                    "[ADKHostManager] 📋 Task now has %s artifacts", len(current_task.artifacts))
             else:
-                print(
+                logger.debug(
                     "[ADKHostManager] 📦 First chunk of streaming artifact - storing in temp cache")
 
-                # This is a chunk of an artifact, stash it in temp store for assembling
-                if artifact.artifactId not in self._artifact_chunks:
-                    self._artifact_chunks[artifact.artifactId] = []
-                self._artifact_chunks[artifact.artifactId].append(artifact)
-                print(
-                    f"[ADKHostManager] 💾 Stored chunk {len(self._artifact_chunks[artifact.artifactId])} for artifact {artifact.artifactId}")
+                # This is the first chunk of an artifact, start the assembly buffer
+                self._artifact_chunks[artifact.artifactId] = _PendingArtifact(
+                    artifact_id=artifact.artifactId,
+                    name=artifact.name,
+                    description=artifact.description,
+                    metadata=artifact.metadata,
+                    parts=list(artifact.parts),
+                )
+                logger.debug(
+                    "[ADKHostManager] 💾 Stored first chunk for artifact %s", artifact.artifactId)
         else:
-            print("[ADKHostManager] ➕ Processing append chunk")
+            logger.debug("[ADKHostManager] ➕ Processing append chunk")
 
             # We received an append chunk, add to the existing temp artifact
-            if artifact.artifactId not in self._artifact_chunks or not self._artifact_chunks[artifact.artifactId]:
-                print(
-                    f"[ADKHostManager] ❌ No existing chunks found for append operation: {artifact.artifactId}")
+            current_temp_artifact = self._artifact_chunks.get(artifact.artifactId)
+            if current_temp_artifact is None:
+                logger.warning(
+                    "[ADKHostManager] ❌ No existing chunks found for append operation: %s", artifact.artifactId)
                 return
 
-            current_temp_artifact = self._artifact_chunks[artifact.artifactId][-1]
-            print(
-                f"[ADKHostManager] 🔗 Appending {len(artifact.parts)} parts to existing artifact")
+            logger.debug(
+                "[ADKHostManager] 🔗 Appending %s parts to existing artifact", len(artifact.parts))
 
             # Extend parts of the current temporary artifact
             current_temp_artifact.parts.extend(artifact.parts)
-            print(
-                f"[ADKHostManager] 📊 Temp artifact now has {len(current_temp_artifact.parts)} total parts")
+            logger.debug(
+                "[ADKHostManager] 📊 Temp artifact now has %s total parts", len(current_temp_artifact.parts))
 
             if task_update_event.lastChunk:
-                print("[ADKHostManager] 🏁 Last chunk received - finalizing artifact")
-
-                # Final chunk - move from temp to task artifacts
-                if current_task.artifacts:
-                    current_task.artifacts.append(current_temp_artifact)
-                else:
-                    current_task.artifacts = [current_temp_artifact]
-
-                # Clean up temp storage
-                del self._artifact_chunks[artifact.artifactId][-1]
-                if not self._artifact_chunks[artifact.artifactId]:
-                    del self._artifact_chunks[artifact.artifactId]
-
-                print("[ADKHostManager] ✅ Artifact finalized and added to task")
-                print("[ADKHostManager] 🧹 Temp storage cleaned up")
-                print(
-                    f"[ADKHostManager] 📋 Task now has {len(current_task.artifacts)} total artifacts")
+                # Final chunk - materialize the artifact and move it to the task.
+                # This stays inline: the Task returned from task_callback is what
+                # HostAgent reads artifacts from, so it must be complete here.
+                self._finalize_artifact(current_task, artifact.artifactId)
             else:
-                print("[ADKHostManager] ⏳ More chunks expected for this artifact")
+                logger.debug(
+                    "[ADKHostManager] ⏳ More chunks expected for this artifact")
 
-        print("[ADKHostManager] ✅ Artifact event processing completed")
+        logger.debug("[ADKHostManager] ✅ Artifact event processing completed")
+
+    def _finalize_artifact(self, current_task: Task, artifact_id: str):
+        final_artifact = self._artifact_chunks.pop(artifact_id).to_artifact()
+        if current_task.artifacts:
+            current_task.artifacts.append(final_artifact)
+        else:
+            current_task.artifacts = [final_artifact]
+        logger.debug(
+            "[ADKHostManager] ✅ Artifact %s finalized (%s parts), task now has %s artifacts",
+            artifact_id, len(final_artifact.parts), len(current_task.artifacts))
 
     def add_event(self, event: Event):
-        self._events[event.id] = event
+        events = self._events
+        old = events.get(event.id)
+        if old is not None:
+            self._drop_sorted_event(old)
+        elif len(events) >= MAX_EVENTS:
+            # dict保持插入顺序，丢弃最早的事件
+            self._drop_sorted_event(events.pop(next(iter(events))))
+        events[event.id] = event
+
+        events_sorted = self._events_sorted
+        if not events_sorted or events_sorted[-1].timestamp <= event.timestamp:
+            # 事件几乎总是按时间顺序到达
+            events_sorted.append(event)
+        else:
+            bisect.insort_right(events_sorted, event, key=_event_timestamp)
+        self._version += 1
+
+    def _drop_sorted_event(self, event: Event):
+        events_sorted = self._events_sorted
+        i = bisect.bisect_left(
+            events_sorted, event.timestamp, key=_event_timestamp)
+        while events_sorted[i] is not event:
+            i += 1
+        del events_sorted[i]
 
     def get_conversation(
         self, conversation_id: str | None
     ) -> Conversation | None:
         if not conversation_id:
             return None
-        return next(
-            filter(
-                lambda c: c and c.conversation_id == conversation_id,
-                self._conversations,
-            ),
-            None,
-        )
+        return self._conversations_by_id.get(conversation_id)
 
     def get_pending_messages(self) -> list[tuple[str, str]]:
-        rval = []
-        for message_id in self._pending_message_ids:
-            if message_id in self._task_map:
-                task_id = self._task_map[message_id]
-                task = next(
-                    filter(lambda x: x.id == task_id, self._tasks), None
-                )
-                if not task:
-                    rval.append((message_id, ''))
-                elif task.history and task.history[-1].parts:
-                    if len(task.history) == 1:
-                        rval.append((message_id, 'Working...'))
-                    else:
-                        part = task.history[-1].parts[0]
-                        rval.append(
-                            (
-                                message_id,
-                                part.root.text
-                                if part.root.kind == 'text'
-                                else 'Working...',
-                            )
-                        )
-            else:
-                rval.append((message_id, ''))
-        return rval
-
-    def register_agent(self, url):
+        task_map = self._task_map
+        tasks_by_id = self._tasks_by_id
+        return [
+            (message_id, text)
+            for message_id in list(self._pending_message_ids)
+            if (text := _pending_text(tasks_by_id.get(task_map.get(message_id))))
+            is not None
+        ]
+
+    async def register_agent(self, url):
         """Register a new remote agent with the Host Agent.
         This implements the agent registration flow from the sequence diagram.
 
@@ -955,43 +1013,45 @@ class ADKHostManager(ApplicationManager):
         Args:
             url: The URL or address of the remote agent to register
         """
-        print(f"[ADKHostManager] 🔗 Registering new remote agent: {url}")
+        logger.debug("[ADKHostManager] 🔗 Registering new remote agent: %s", url)
 
         try:
             # Resolve agent card from the provided URL
-            print("[ADKHostManager] 🔍 Resolving agent card from URL")
-            agent_data = get_agent_card(url)
+            logger.debug("[ADKHostManager] 🔍 Resolving agent card from URL")
+            # 通过共享的异步HTTP客户端获取，复用连接且不阻塞事件循环
+            agent_data = await get_agent_card_async(url)
 
             if not agent_data.url:
-                print(f"[ADKHostManager] 🔧 Setting agent URL: {url}")
+                logger.debug("[ADKHostManager] 🔧 Setting agent URL: %s", url)
                 agent_data.url = url
 
-            print("[ADKHostManager] ✅ Agent card resolved successfully")
-            print(f"[ADKHostManager] 🤖 Agent name: {agent_data.name}")
-            print(
-                f"[ADKHostManager] 📝 Agent description: {agent_data.description[:100]}...")
-            print(
-                f"[ADKHostManager] 🔄 Streaming support: {agent_data.capabilities.streaming if agent_data.capabilities else 'Unknown'}")
+            logger.debug("[ADKHostManager] ✅ Agent card resolved successfully")
+            logger.debug("[ADKHostManager] 🤖 Agent name: %s", agent_data.name)
+            logger.debug(
+                "[ADKHostManager] 📝 Agent description: %s...", agent_data.description[:100])
+            logger.debug(
+                "[ADKHostManager] 🔄 Streaming support: %s", agent_data.capabilities.streaming if agent_data.capabilities else 'Unknown')
 
             # Add agent to the list of available agents
             self._agents.append(agent_data)
-            print("[ADKHostManager] 📋 Added agent to available agents list")
+            self._version += 1
+            logger.debug("[ADKHostManager] 📋 Added agent to available agents list")
 
             # Register agent card with the Host Agent
             self._host_agent.register_agent_card(agent_data)
-            print("[ADKHostManager] 🤖 Registered agent card with Host Agent")
+            logger.debug("[ADKHostManager] 🤖 Registered agent card with Host Agent")
 
             # Reinitialize Host Agent with updated agent list
-            print(
-                "[ADKHostManager] 🔄 Reinitializing Host Agent with updated agent list")
-            self._initialize_host()
+            logger.debug(
+                "[ADKHostManager] 🔄 Host Agent will be reinitialized with updated agent list")
+            self._host_dirty = True
 
-            print("[ADKHostManager] ✅ Agent registration completed successfully")
-            print(
-                f"[ADKHostManager] 📊 Total available agents: {len(self._agents)}")
+            logger.debug("[ADKHostManager] ✅ Agent registration completed successfully")
+            logger.debug(
+                "[ADKHostManager] 📊 Total available agents: %s", len(self._agents))
 
         except Exception as e:
-            print(f"[ADKHostManager] ❌ Failed to register agent {url}: {e!s}")
+            logger.error("[ADKHostManager] ❌ Failed to register agent %s: %s", url, e)
             raise
 
     @property
@@ -1008,7 +1068,7 @@ class ADKHostManager(ApplicationManager):
 
     @property
     def events(self) -> list[Event]:
-        return sorted(self._events.values(), key=lambda x: x.timestamp)
+        return list(self._events_sorted)
 
     def adk_content_from_message(self, message: Message) -> types.Content:
         """Convert A2A Message format to ADK Content format.
@@ -1016,39 +1076,7 @@ class ADKHostManager(ApplicationManager):
 
         Flow: A2A Message -> ADK Content -> Host Agent LLM processing
         """
-        # print(f"[ADKHostManager] 🔄 Converting A2A Message to ADK Content format")
-        # print(f"[ADKHostManager] 📝 Message has {len(message.parts)} parts to convert")
-
-        parts: list[types.Part] = []
-        for i, p in enumerate(message.parts):
-            part = p.root
-            # print(f"[ADKHostManager] 🔧 Converting part {i+1}: {part.kind}")
-
-            if part.kind == 'text':
-                parts.append(types.Part.from_text(text=part.text))
-                # print(f"[ADKHostManager] ✅ Text part converted: {len(part.text)} characters")
-            elif part.kind == 'data':
-                json_string = json.dumps(part.data)
-                parts.append(types.Part.from_text(text=json_string))
-                # print(f"[ADKHostManager] ✅ Data part converted to JSON: {len(json_string)} characters")
-            elif part.kind == 'file':
-                if isinstance(part.file, FileWithUri):
-                    parts.append(
-                        types.Part.from_uri(
-                            file_uri=part.file.uri,
-                            mime_type=part.file.mimeType,
-                        )
-                    )
-                    # print(f"[ADKHostManager] ✅ File URI part converted: {part.file.uri}")
-                else:
-                    parts.append(
-                        types.Part.from_bytes(
-                            data=part.file.bytes.encode('utf-8'),
-                            mime_type=part.file.mimeType or 'application/octet-stream',
-                        )
-                    )
-                    # print(f"[ADKHostManager] ✅ File bytes part converted: {len(part.file.bytes)} bytes")
-
+        parts = [_a2a_part_to_adk(p.root) for p in message.parts]
         content = types.Content(parts=parts, role=str(message.role))
         # print(f"[ADKHostManager] ✅ A2A Message successfully converted to ADK Content")
         return content
@@ -1064,108 +1092,66 @@ class ADKHostManager(ApplicationManager):
 
         Flow: Host Agent LLM output -> ADK Content -> A2A Message -> UI display
         """
-        print("[ADKHostManager] 🔄 Converting ADK Content to A2A Message format")
-        print(
-            f"[ADKHostManager] 📝 Content has {len(content.parts) if content.parts else 0} parts to convert")
-        print(
-            f"[ADKHostManager] 🎯 Context ID: {context_id}, Task ID: {task_id}")
+        message, _ = await self._adk_content_to_message(
+            content, context_id, task_id)
+        return message
+
+    async def _adk_content_to_message(
+        self,
+        content: types.Content,
+        context_id: str | None,
+        task_id: str | None,
+    ) -> tuple[Message, int]:
+        """Same as adk_content_to_message, also returning the total length
+        of the text parts measured during conversion."""
+        logger.debug("[ADKHostManager] 🔄 Converting ADK Content to A2A Message format")
+        logger.debug(
+            "[ADKHostManager] 📝 Content has %s parts to convert", len(content.parts) if content.parts else 0)
+        logger.debug(
+            "[ADKHostManager] 🎯 Context ID: %s, Task ID: %s", context_id, task_id)
 
         parts: list[Part] = []
+        role = Role.user if content.role == "user" else Role.agent
         if not content.parts:
-            print("[ADKHostManager] ⚠️ No content parts found, creating empty message")
+            logger.debug(
+                "[ADKHostManager] ⚠️ No content parts found, creating empty message")
             return Message(
                 parts=[],
-                role=Role.user if content.role == "user" else Role.agent,
+                role=role,
                 contextId=context_id,
                 taskId=task_id,
-                messageId=str(uuid.uuid4()),
-            )
+                messageId=_uuid_pool.next(),
+            ), 0
+        text_len = 0
         for part in content.parts:
             if part.text:
-                # try parse as data
-                try:
-                    data = json.loads(part.text)
-                    parts.append(Part(root=DataPart(data=data)))
-                except:
-                    parts.append(Part(root=TextPart(text=part.text)))
-            elif part.inline_data:
-                # Handle inline data safely with proper null checks
-                if hasattr(part.inline_data, 'data') and part.inline_data.data is not None:
-                    data_bytes = part.inline_data.data
-                    if isinstance(data_bytes, bytes):
-                        try:
-                            data_str = data_bytes.decode('utf-8')
-                        except UnicodeDecodeError:
-                            data_str = base64.b64encode(
-                                data_bytes).decode('utf-8')
-                    else:
-                        data_str = str(data_bytes)
-                else:
-                    data_str = str(
-                        part.inline_data) if part.inline_data else ""
-
-                parts.append(
-                    Part(
-                        root=FilePart(
-                            file=FileWithBytes(
-                                bytes=data_str,
-                                mimeType=getattr(
-                                    part.file_data, 'mime_type', 'application/octet-stream') if part.file_data else 'application/octet-stream',
-                            ),
-                        )
-                    )
-                )
-            elif part.file_data:
-                parts.append(
-                    Part(
-                        root=FilePart(
-                            file=FileWithUri(
-                                uri=part.file_data.file_uri or '',
-                                mimeType=getattr(
-                                    part.file_data, 'mime_type', 'application/octet-stream'),
-                            )
-                        )
-                    )
-                )
-            # These aren't managed by the A2A message structure, these are internal
-            # details of ADK, we will simply flatten these to json representations.
-            elif part.video_metadata:
-                parts.append(
-                    Part(root=DataPart(data=part.video_metadata.model_dump()))
-                )
-            elif part.thought:
-                parts.append(Part(root=TextPart(text='thought')))
-            elif part.executable_code:
-                parts.append(
-                    Part(root=DataPart(data=part.executable_code.model_dump()))
-                )
-            elif part.function_call:
-                parts.append(
-                    Part(root=DataPart(data=part.function_call.model_dump()))
-                )
-            elif part.function_response:
+                text_len += len(part.text)
+            converted = _adk_part_to_a2a(part)
+            if converted is not None:
+                parts.append(converted)
+            else:
+                # function responses may need the async artifact service
                 parts.extend(
                     await self._handle_function_response(
                         part, context_id, task_id
                     )
                 )
-            else:
-                raise ValueError('Unexpected content, unknown type')
 
         message = Message(
-            role=Role.user if content.role == "user" else Role.agent,
+            role=role,
             parts=parts,
             contextId=context_id,
             taskId=task_id,
-            messageId=str(uuid.uuid4()),
+            messageId=_uuid_pool.next(),
         )
 
-        print("[ADKHostManager] ✅ ADK Content successfully converted to A2A Message")
-        print(
-            f"[ADKHostManager] 📄 Final message has {len(parts)} parts, Role: {message.role}")
-        print(f"[ADKHostManager] 🆔 Message ID: {message.messageId}")
+        logger.debug(
+            "[ADKHostManager] ✅ ADK Content successfully converted to A2A Message")
+        logger.debug(
+            "[ADKHostManager] 📄 Final message has %s parts, Role: %s", len(parts), message.role)
+        logger.debug("[ADKHostManager] 🆔 Message ID: %s", message.messageId)
 
-        return message
+        return message, text_len
 
     async def _handle_function_response(
         self, part: types.Part, context_id: str | None, task_id: str | None
@@ -1187,53 +1173,53 @@ class ADKHostManager(ApplicationManager):
         Returns:
             List of A2A Parts converted from function response
         """
-        print("[ADKHostManager] 🔧 Processing function response")
-        print(f"[ADKHostManager] 🎯 Context ID: {context_id}")
-        print(f"[ADKHostManager] 📋 Task ID: {task_id}")
+        logger.debug("[ADKHostManager] 🔧 Processing function response")
+        logger.debug("[ADKHostManager] 🎯 Context ID: %s", context_id)
+        logger.debug("[ADKHostManager] 📋 Task ID: %s", task_id)
 
         parts = []
         try:
             # Check if function_response and response exist and are not None
             if not part.function_response or not part.function_response.response:
-                print(
+                logger.debug(
                     "[ADKHostManager] ⚠️ No function response or response data found")
                 return parts
 
-            response_data = part.function_response.response.get('result', [])
-            print(
-                f"[ADKHostManager] 📊 Processing {len(response_data)} response items")
+            result = part.function_response.response.get('result') or []
+            logger.debug(
+                "[ADKHostManager] 📊 Processing %s response items", len(result))
 
-            for i, p in enumerate(part.function_response.response['result']):
-                print(
-                    f"[ADKHostManager] 🔧 Processing response item {i+1}: {type(p).__name__}")
+            for i, p in enumerate(result):
+                logger.debug(
+                    "[ADKHostManager] 🔧 Processing response item %s: %s", i + 1, type(p).__name__)
 
                 if isinstance(p, str):
-                    print(
-                        f"[ADKHostManager] 📝 Converting string response: {len(p)} characters")
+                    logger.debug(
+                        "[ADKHostManager] 📝 Converting string response: %s characters", len(p))
                     parts.append(Part(root=TextPart(text=p)))
 
                 elif isinstance(p, dict):
                     if 'kind' in p and p['kind'] == 'file':
-                        print(
+                        logger.debug(
                             "[ADKHostManager] 📁 Converting dictionary file response")
                         parts.append(Part(root=FilePart(**p)))
                     else:
-                        print(
-                            f"[ADKHostManager] 📋 Converting dictionary data response: {len(p)} keys")
+                        logger.debug(
+                            "[ADKHostManager] 📋 Converting dictionary data response: %s keys", len(p))
                         parts.append(Part(root=DataPart(data=p)))
 
                 elif isinstance(p, DataPart):
                     if 'artifact-file-id' in p.data:
-                        print(
-                            f"[ADKHostManager] 🎨 Processing artifact file: {p.data['artifact-file-id']}")
+                        logger.debug(
+                            "[ADKHostManager] 🎨 Processing artifact file: %s", p.data['artifact-file-id'])
 
                         # Check context_id is not None before using it
                         if not context_id:
-                            print(
+                            logger.debug(
                                 "[ADKHostManager] ⚠️ No context_id provided for artifact loading, skipping")
                             continue
 
-                        print("[ADKHostManager] 📂 Loading artifact from service")
+                        logger.debug("[ADKHostManager] 📂 Loading artifact from service")
                         file_part = await self._artifact_service.load_artifact(
                             user_id=self.user_id,
                             session_id=context_id,
@@ -1244,11 +1230,12 @@ class ADKHostManager(ApplicationManager):
                         if file_part and file_part.inline_data:
                             file_data = file_part.inline_data
                             if file_data.data is not None:
-                                print(
-                                    f"[ADKHostManager] 📦 Encoding artifact data to base64: {len(file_data.data)} bytes")
-                                base64_data = base64.b64encode(file_data.data).decode(
-                                    'utf-8'
-                                )
+                                logger.debug(
+                                    "[ADKHostManager] 📦 Encoding artifact data to base64: %s bytes", len(file_data.data))
+                                # binascii works on the buffer directly; base64 output is ASCII
+                                base64_data = binascii.b2a_base64(
+                                    memoryview(file_data.data), newline=False
+                                ).decode('ascii')
                                 parts.append(
                                     Part(
                                         root=FilePart(
@@ -1260,55 +1247,188 @@ class ADKHostManager(ApplicationManager):
                                         )
                                     )
                                 )
-                                print(
+                                logger.debug(
                                     "[ADKHostManager] ✅ Artifact file converted successfully")
                             else:
-                                print(
+                                logger.debug(
                                     "[ADKHostManager] ⚠️ Artifact file data is None")
                         else:
-                            print(
+                            logger.debug(
                                 "[ADKHostManager] ⚠️ Failed to load artifact or no inline data")
                     else:
-                        print(
-                            f"[ADKHostManager] 📋 Converting DataPart: {len(p.data)} data items")
+                        logger.debug(
+                            "[ADKHostManager] 📋 Converting DataPart: %s data items", len(p.data))
                         parts.append(Part(root=DataPart(data=p.data)))
 
                 else:
-                    print(
+                    logger.debug(
                         "[ADKHostManager] ❓ Unknown response type, creating default content")
                     content = Message(
                         parts=[Part(root=TextPart(text='Unknown content'))],
                         role=Role.agent,
-                        messageId=str(uuid.uuid4()),
+                        messageId=_uuid_pool.next(),
                         taskId=task_id,
                         contextId=context_id,
                     )
 
-            print(
-                f"[ADKHostManager] ✅ Function response processing completed: {len(parts)} parts created")
+            logger.debug(
+                "[ADKHostManager] ✅ Function response processing completed: %s parts created", len(parts))
 
         except Exception as e:
-            print(
-                f"[ADKHostManager] ❌ Error converting function response to messages: {e!s}")
-            print("[ADKHostManager] 🔧 Creating fallback response")
+            logger.error(
+                "[ADKHostManager] ❌ Error converting function response to messages: %s", e)
+            logger.debug("[ADKHostManager] 🔧 Creating fallback response")
 
             # Check if function_response exists before calling model_dump
             if part.function_response:
-                print(
+                logger.debug(
                     "[ADKHostManager] 📋 Using function_response model dump as fallback")
                 parts.append(
                     Part(root=DataPart(data=part.function_response.model_dump()))
                 )
             else:
-                print("[ADKHostManager] 📝 Using error text as fallback")
+                logger.debug("[ADKHostManager] 📝 Using error text as fallback")
                 parts.append(
                     Part(root=TextPart(text="Error processing function response"))
                 )
 
-        print(f"[ADKHostManager] 🎯 Returning {len(parts)} converted parts")
+        logger.debug("[ADKHostManager] 🎯 Returning %s converted parts", len(parts))
         return parts
 
 
+# types.Part constructors, bound once instead of looked up per converted part
+_part_from_text = types.Part.from_text
+_part_from_uri = types.Part.from_uri
+_part_from_bytes = types.Part.from_bytes
+
+
+def _a2a_part_to_adk(part: TextPart | DataPart | FilePart) -> types.Part:
+    """Convert a single A2A part to an ADK part."""
+    if part.kind == 'text':
+        return _part_from_text(text=part.text)
+    if part.kind == 'data':
+        return _part_from_text(text=orjson.dumps(part.data).decode())
+    if isinstance(part.file, FileWithUri):
+        return _part_from_uri(
+            file_uri=part.file.uri,
+            mime_type=part.file.mimeType,
+        )
+    # FileWithBytes.bytes is base64 per the A2A spec; tolerate raw text producers
+    try:
+        data = base64.b64decode(part.file.bytes, validate=True)
+    except binascii.Error:
+        data = part.file.bytes.encode('utf-8')
+    return _part_from_bytes(
+        data=data,
+        mime_type=part.file.mimeType or 'application/octet-stream',
+    )
+
+
+def _file_mime_type(part: types.Part) -> str:
+    file_data = part.file_data
+    if file_data and file_data.mime_type:
+        return file_data.mime_type
+    return 'application/octet-stream'
+
+
+def _h_text(text: str, part: types.Part) -> Part:
+    # try parse as data; only a JSON object can become a DataPart. LLM output
+    # often has leading whitespace, which orjson accepts like json.loads did
+    if text.lstrip()[:1] == '{':
+        try:
+            return Part(root=DataPart(data=orjson.loads(text)))
+        except ValueError:
+            pass
+    return Part(root=TextPart(text=text))
+
+
+def _h_inline(inline_data: types.Blob, part: types.Part) -> Part:
+    # Handle inline data safely with proper null checks
+    if getattr(inline_data, 'data', None) is not None:
+        data_bytes = inline_data.data
+        if isinstance(data_bytes, bytes):
+            try:
+                data_str = data_bytes.decode('utf-8')
+            except UnicodeDecodeError:
+                data_str = base64.b64encode(data_bytes).decode('utf-8')
+        else:
+            data_str = str(data_bytes)
+    else:
+        data_str = str(inline_data)
+
+    return Part(
+        root=FilePart(
+            file=FileWithBytes(bytes=data_str, mimeType=_file_mime_type(part)),
+        )
+    )
+
+
+def _h_file(file_data: types.FileData, part: types.Part) -> Part:
+    return Part(
+        root=FilePart(
+            file=FileWithUri(
+                uri=file_data.file_uri or '', mimeType=_file_mime_type(part))
+        )
+    )
+
+
+def _h_model_dump(value, part: types.Part) -> Part:
+    # These aren't managed by the A2A message structure, these are internal
+    # details of ADK, we will simply flatten these to json representations.
+    return Part(root=DataPart(data=value.model_dump()))
+
+
+def _h_thought(thought: bool, part: types.Part) -> Part:
+    return Part(root=TextPart(text='thought'))
+
+
+def _h_function_response(value, part: types.Part) -> None:
+    # converted by ADKHostManager._handle_function_response
+    return None
+
+
+# (ADK part attribute, handler), checked in order; text is by far the most common
+_ADK_PART_DISPATCH = (
+    ('text', _h_text),
+    ('inline_data', _h_inline),
+    ('file_data', _h_file),
+    ('video_metadata', _h_model_dump),
+    ('thought', _h_thought),
+    ('executable_code', _h_model_dump),
+    ('function_call', _h_model_dump),
+    ('function_response', _h_function_response),
+)
+
+
+def _adk_part_to_a2a(part: types.Part) -> Part | None:
+    """Convert a single ADK part to an A2A part.
+
+    Returns None for function responses, which are converted by
+    ADKHostManager._handle_function_response.
+    """
+    for attr, handler in _ADK_PART_DISPATCH:
+        value = getattr(part, attr, None)
+        if value:
+            return handler(value, part)
+    raise ValueError('Unexpected content, unknown type')
+
+
+def _pending_text(task: Task | None) -> str | None:
+    """Status text shown for a pending message, None when it has none yet."""
+    if not task:
+        return ''
+    if not task.history or not task.history[-1].parts:
+        return None
+    if len(task.history) == 1:
+        return 'Working...'
+    part = task.history[-1].parts[0]
+    return part.root.text if part.root.kind == 'text' else 'Working...'
+
+
+def _event_timestamp(event: Event) -> float:
+    return event.timestamp
+
+
 def get_message_id(m: Message | None) -> str | None:
     """Extract message ID from Message metadata.
     Used for tracking message lineage in the A2A flow.
@@ -1320,7 +1440,7 @@ def get_message_id(m: Message | None) -> str | None:
         Message ID if found, None otherwise
     """
     if not m:
-        print("[ADKHostManager] ⚠️ get_message_id: No message provided")
+        logger.debug("[ADKHostManager] ⚠️ get_message_id: No message provided")
         return None
 
     if not m.metadata or 'message_id' not in m.metadata:
@@ -1328,7 +1448,7 @@ def get_message_id(m: Message | None) -> str | None:
         return None
 
     message_id = m.metadata['message_id']
-    print(f"[ADKHostManager] 🆔 get_message_id: Found message ID: {message_id}")
+    logger.debug("[ADKHostManager] 🆔 get_message_id: Found message ID: %s", message_id)
     return message_id
 
 
@@ -1345,16 +1465,4 @@ def task_still_open(task: Task | None) -> bool:
     Returns:
         True if task is still active, False otherwise
     """
-    if not task:
-        print("[ADKHostManager] ⚠️ task_still_open: No task provided")
-        return False
-
-    is_open = task.status.state in [
-        TaskState.submitted,
-        TaskState.working,
-        TaskState.input_required,
-    ]
-
-    print(
-        f"[ADKHostManager] 📋 task_still_open: Task {task.id} state: {task.status.state}, open: {is_open}")
-    return is_open
+    return task is not None and task.status.state in _OPEN_STATES
@@ -1,3 +1,5 @@
+import os
+
 from abc import ABC, abstractmethod
 
 from a2a.types import AgentCard, Message, Task
@@ -5,7 +7,19 @@ from a2a.types import AgentCard, Message, Task
 from service.types import Conversation, Event
 
 
+# 保留的UI事件上限；长时间运行的会话中，超出后最早的事件会被丢弃
+MAX_EVENTS = int(os.environ.get('A2A_UI_MAX_EVENTS', '10000'))
+
+
 class ApplicationManager(ABC):
+    # Bumped on every change to conversations, tasks, agents or events so the
+    # server can reuse serialized list responses while nothing has changed.
+    _version: int = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
     @abstractmethod
     async def create_conversation(self) -> Conversation:
         pass
@@ -19,7 +33,7 @@ class ApplicationManager(ABC):
         pass
 
     @abstractmethod
-    def register_agent(self, url: str):
+    async def register_agent(self, url: str):
         pass
 
     @abstractmethod
@@ -1,7 +1,10 @@
 import asyncio
-import datetime
+import logging
+import time
 import uuid
 
+from collections import deque
+
 from a2a.types import (
     AgentCard,
     Artifact,
@@ -14,13 +17,16 @@ from a2a.types import (
     TaskStatus,
     TextPart,
 )
-from utils.agent_card import get_agent_card
+from utils.agent_card import get_agent_card_async
 
 from service.server.adk_host_manager import task_still_open
-from service.server.application_manager import ApplicationManager
+from service.server.application_manager import MAX_EVENTS, ApplicationManager
 from service.types import Conversation, Event
 
 
+logger = logging.getLogger(__name__)
+
+
 class InMemoryFakeAgentManager(ApplicationManager):
     """An implementation of memory based management with fake agent actions.
 
@@ -33,10 +39,16 @@ class InMemoryFakeAgentManager(ApplicationManager):
     """
 
     _conversations: list[Conversation]
-    _messages: list[Message]
+    _conversations_by_id: dict[str, Conversation]
+    _messages: deque[Message]
     _tasks: list[Task]
-    _events: list[Event]
-    _pending_message_ids: list[str]
+    _tasks_by_id: dict[str, Task]
+    _task_index: dict[str, int]
+    _event_ids: deque[str]
+    _event_actors: deque[str]
+    _event_contents: deque[Message]
+    _event_timestamps: deque[float]
+    _pending_message_ids: dict[str, None]
     _next_message_idx: int
     _agents: list[AgentCard]
 
@@ -44,16 +56,27 @@ class InMemoryFakeAgentManager(ApplicationManager):
         """Initialize the in-memory fake agent manager.
         Sets up empty collections for conversations, messages, tasks, and events.
         """
-        print("[InMemoryFakeAgentManager] 🚀 Initializing fake agent manager")
+        logger.debug("[InMemoryFakeAgentManager] 🚀 Initializing fake agent manager")
         self._conversations = []
-        self._messages = []
+        # conversation id -> conversation, for O(1) lookups
+        self._conversations_by_id = {}
+        # bounded like ADKHostManager's event store; oldest entries drop off
+        self._messages = deque(maxlen=MAX_EVENTS)
         self._tasks = []
-        self._events = []
-        self._pending_message_ids = []
+        # task id -> task / position in self._tasks, for O(1) lookups
+        self._tasks_by_id = {}
+        self._task_index = {}
+        # events are stored column-wise; Event models are only built on read
+        self._event_ids = deque(maxlen=MAX_EVENTS)
+        self._event_actors = deque(maxlen=MAX_EVENTS)
+        self._event_contents = deque(maxlen=MAX_EVENTS)
+        self._event_timestamps = deque(maxlen=MAX_EVENTS)
+        # insertion-ordered pending message ids with O(1) add/remove
+        self._pending_message_ids = {}
         self._next_message_idx = 0
         self._agents = []
         self._task_map = {}
-        print("[InMemoryFakeAgentManager] ✅ Initialization complete")
+        logger.debug("[InMemoryFakeAgentManager] ✅ Initialization complete")
 
     async def create_conversation(self) -> Conversation:
         """Create a new conversation for testing purposes.
@@ -62,16 +85,18 @@ class InMemoryFakeAgentManager(ApplicationManager):
         Returns:
             New Conversation object with generated ID
         """
-        conversation_id = str(uuid.uuid4())
-        print(
-            f"[InMemoryFakeAgentManager] 💬 Creating new conversation: {conversation_id}")
+        conversation_id = uuid.uuid4().hex
+        logger.debug(
+            "[InMemoryFakeAgentManager] 💬 Creating new conversation: %s", conversation_id)
 
         c = Conversation(conversation_id=conversation_id, is_active=True)
         self._conversations.append(c)
+        self._conversations_by_id[conversation_id] = c
+        self._version += 1
 
-        print("[InMemoryFakeAgentManager] ✅ Conversation created successfully")
-        print(
-            f"[InMemoryFakeAgentManager] 📊 Total conversations: {len(self._conversations)}")
+        logger.debug("[InMemoryFakeAgentManager] ✅ Conversation created successfully")
+        logger.debug(
+            "[InMemoryFakeAgentManager] 📊 Total conversations: %s", len(self._conversations))
         return c
 
     def sanitize_message(self, message: Message) -> Message:
@@ -89,56 +114,50 @@ class InMemoryFakeAgentManager(ApplicationManager):
         Returns:
             Sanitized message with appropriate task ID
         """
-        print("[InMemoryFakeAgentManager] 🔧 Sanitizing message")
-        print(f"[InMemoryFakeAgentManager] 🎯 Context ID: {message.contextId}")
-        print(
-            f"[InMemoryFakeAgentManager] 📋 Current Task ID: {message.taskId}")
+        logger.debug("[InMemoryFakeAgentManager] 🔧 Sanitizing message")
+        logger.debug("[InMemoryFakeAgentManager] 🎯 Context ID: %s", message.contextId)
+        logger.debug("[InMemoryFakeAgentManager] 📋 Current Task ID: %s", message.taskId)
 
         if message.contextId:
             conversation = self.get_conversation(message.contextId)
-            print(
-                f"[InMemoryFakeAgentManager] 💬 Found conversation: {conversation is not None}")
+            logger.debug(
+                "[InMemoryFakeAgentManager] 💬 Found conversation: %s", conversation is not None)
         else:
             conversation = None
-            print("[InMemoryFakeAgentManager] ⚠️ No context ID provided")
+            logger.debug("[InMemoryFakeAgentManager] ⚠️ No context ID provided")
 
         if not conversation:
-            print(
+            logger.debug(
                 "[InMemoryFakeAgentManager] ✅ No conversation context, returning message as-is")
             return message
 
         # Check if the last event in the conversation was tied to a task.
         if conversation.messages:
             last_message = conversation.messages[-1]
-            print(
-                f"[InMemoryFakeAgentManager] 📄 Last message task ID: {last_message.taskId}")
+            logger.debug(
+                "[InMemoryFakeAgentManager] 📄 Last message task ID: %s", last_message.taskId)
 
             if last_message.taskId:
                 # Find the task and check if it's still open
-                task = next(
-                    filter(
-                        lambda x: x.id == last_message.taskId,
-                        self._tasks,
-                    ),
-                    None,
-                )
+                task = self._tasks_by_id.get(last_message.taskId)
 
                 if task:
                     is_open = task_still_open(task)
-                    print(
-                        f"[InMemoryFakeAgentManager] 📋 Task {task.id} is open: {is_open}")
+                    logger.debug(
+                        "[InMemoryFakeAgentManager] 📋 Task %s is open: %s", task.id, is_open)
 
                     if is_open:
-                        print(
-                            f"[InMemoryFakeAgentManager] 🔗 Continuing task: {last_message.taskId}")
+                        logger.debug(
+                            "[InMemoryFakeAgentManager] 🔗 Continuing task: %s", last_message.taskId)
                         message.taskId = last_message.taskId
                 else:
-                    print(
-                        f"[InMemoryFakeAgentManager] ⚠️ Task not found: {last_message.taskId}")
+                    logger.debug(
+                        "[InMemoryFakeAgentManager] ⚠️ Task not found: %s", last_message.taskId)
         else:
-            print("[InMemoryFakeAgentManager] 📭 No previous messages in conversation")
+            logger.debug(
+                "[InMemoryFakeAgentManager] 📭 No previous messages in conversation")
 
-        print("[InMemoryFakeAgentManager] ✅ Message sanitization complete")
+        logger.debug("[InMemoryFakeAgentManager] ✅ Message sanitization complete")
         return message
 
     async def process_message(self, message: Message, correlation_id: str | None = None):
@@ -156,10 +175,9 @@ class InMemoryFakeAgentManager(ApplicationManager):
         Args:
             message: Input message to process
         """
-        print("[InMemoryFakeAgentManager] 🎯 Processing message")
-        print(f"[InMemoryFakeAgentManager] 🆔 Message ID: {message.messageId}")
-        print(f"[InMemoryFakeAgentManager] 💬 Context ID: {message.contextId}")
-        print(f"[InMemoryFakeAgentManager] 📋 Task ID: {message.taskId}")
+        logger.debug(
+            "[InMemoryFakeAgentManager] 🎯 Processing message - ID: %s, Context: %s, Task: %s",
+            message.messageId, message.contextId, message.taskId)
 
         # Store the message
         self._messages.append(message)
@@ -168,83 +186,67 @@ class InMemoryFakeAgentManager(ApplicationManager):
         task_id = message.taskId or ''
 
         if message_id:
-            self._pending_message_ids.append(message_id)
-            print(
-                f"[InMemoryFakeAgentManager] ⏳ Added to pending messages: {message_id}")
+            self._pending_message_ids[message_id] = None
+            logger.debug(
+                "[InMemoryFakeAgentManager] ⏳ Added to pending messages: %s", message_id)
 
         # Add to conversation
         conversation = self.get_conversation(context_id)
         if conversation:
             conversation.messages.append(message)
-            print("[InMemoryFakeAgentManager] 💬 Added message to conversation")
+            self._version += 1
+            logger.debug("[InMemoryFakeAgentManager] 💬 Added message to conversation")
         else:
-            print("[InMemoryFakeAgentManager] ⚠️ No conversation found for context")
+            logger.debug(
+                "[InMemoryFakeAgentManager] ⚠️ No conversation found for context")
 
         # Create event for UI
-        print("[InMemoryFakeAgentManager] 📢 Creating UI event for message")
-        self._events.append(
-            Event(
-                id=str(uuid.uuid4()),
-                actor='host',
-                content=message,
-                timestamp=datetime.datetime.utcnow().timestamp(),
-            )
-        )
-
-        # Create task for processing
-        print("[InMemoryFakeAgentManager] 📋 Creating processing task")
-        task = Task(
-            id=task_id,
-            contextId=context_id,
-            status=TaskStatus(
-                state=TaskState.submitted,
-                message=message,
-            ),
-            history=[message],
-        )
+        logger.debug("[InMemoryFakeAgentManager] 📢 Creating UI event for message")
+        self._record_event(uuid.uuid4().hex, 'host', message, time.time())
 
+        # Create task for processing, only when it is going to be stored
+        task: Task | None = None
         if self._next_message_idx != 0:
-            print("[InMemoryFakeAgentManager] 📝 Adding task to queue")
+            logger.debug("[InMemoryFakeAgentManager] 📋 Creating processing task")
+            task = _submitted_task(task_id, context_id, message)
+            logger.debug("[InMemoryFakeAgentManager] 📝 Adding task to queue")
             self.add_task(task)
 
-        # Simulate processing delay
-        print(
-            f"[InMemoryFakeAgentManager] ⏱️ Simulating processing delay: {self._next_message_idx}s")
-        await asyncio.sleep(self._next_message_idx)
+        # Simulate processing delay (skip the scheduler round-trip for no delay)
+        delay = self._next_message_idx
+        if delay:
+            logger.debug(
+                "[InMemoryFakeAgentManager] ⏱️ Simulating processing delay: %ss", delay)
+            await asyncio.sleep(delay)
 
         # Generate fake response
-        print("[InMemoryFakeAgentManager] 🤖 Generating fake response")
+        logger.debug("[InMemoryFakeAgentManager] 🤖 Generating fake response")
         response = self.next_message()
 
         if conversation:
             conversation.messages.append(response)
-            print("[InMemoryFakeAgentManager] 💬 Added response to conversation")
+            self._version += 1
+            logger.debug("[InMemoryFakeAgentManager] 💬 Added response to conversation")
 
         # Create event for response
-        print("[InMemoryFakeAgentManager] 📢 Creating UI event for response")
-        self._events.append(
-            Event(
-                id=str(uuid.uuid4()),
-                actor='host',
-                content=response,
-                timestamp=datetime.datetime.utcnow().timestamp(),
-            )
-        )
+        logger.debug("[InMemoryFakeAgentManager] 📢 Creating UI event for response")
+        self._record_event(uuid.uuid4().hex, 'host', response, time.time())
 
         # Remove from pending
-        if message_id in self._pending_message_ids:
-            self._pending_message_ids.remove(message_id)
-            print("[InMemoryFakeAgentManager] ✅ Removed from pending messages")
-
-        # Complete the task
-        if task:
-            print("[InMemoryFakeAgentManager] 🏁 Completing task with artifacts")
+        self._pending_message_ids.pop(message_id, None)
+        logger.debug("[InMemoryFakeAgentManager] ✅ Removed from pending messages")
+
+        # Complete the task; update_task only persists tasks already known
+        if task is None and task_id in self._task_index:
+            task = _submitted_task(task_id, context_id, message)
+        if task is not None:
+            logger.debug("[InMemoryFakeAgentManager] 🏁 Completing task with artifacts")
             task.status.state = TaskState.completed
             task.artifacts = [
                 Artifact(
                     name='response',
                     parts=response.parts,
-                    artifactId=str(uuid.uuid4()),
+                    artifactId=uuid.uuid4().hex,
                 )
             ]
             if not task.history:
@@ -253,7 +255,7 @@ class InMemoryFakeAgentManager(ApplicationManager):
                 task.history.append(response)
             self.update_task(task)
 
-        print("[InMemoryFakeAgentManager] ✅ Message processing complete")
+        logger.debug("[InMemoryFakeAgentManager] ✅ Message processing complete")
 
     def add_task(self, task: Task):
         """Add a task to the fake task queue.
@@ -261,9 +263,12 @@ class InMemoryFakeAgentManager(ApplicationManager):
         Args:
             task: Task to add to the queue
         """
-        print(f"[InMemoryFakeAgentManager] 📝 Adding task to queue: {task.id}")
+        logger.debug("[InMemoryFakeAgentManager] 📝 Adding task to queue: %s", task.id)
+        self._task_index[task.id] = len(self._tasks)
+        self._tasks_by_id[task.id] = task
         self._tasks.append(task)
-        print(f"[InMemoryFakeAgentManager] 📊 Total tasks: {len(self._tasks)}")
+        self._version += 1
+        logger.debug("[InMemoryFakeAgentManager] 📊 Total tasks: %s", len(self._tasks))
 
     def update_task(self, task: Task):
         """Update an existing task in the queue.
@@ -271,17 +276,18 @@ class InMemoryFakeAgentManager(ApplicationManager):
         Args:
             task: Task with updated information
         """
-        print(f"[InMemoryFakeAgentManager] 🔄 Updating task: {task.id}")
+        logger.debug("[InMemoryFakeAgentManager] 🔄 Updating task: %s", task.id)
 
-        for i, t in enumerate(self._tasks):
-            if t.id == task.id:
-                self._tasks[i] = task
-                print(
-                    f"[InMemoryFakeAgentManager] ✅ Task updated at index {i}")
-                return
+        i = self._task_index.get(task.id)
+        if i is not None:
+            self._tasks[i] = task
+            self._tasks_by_id[task.id] = task
+            self._version += 1
+            logger.debug("[InMemoryFakeAgentManager] ✅ Task updated at index %s", i)
+            return
 
-        print(
-            f"[InMemoryFakeAgentManager] ⚠️ Task not found for update: {task.id}")
+        logger.debug(
+            "[InMemoryFakeAgentManager] ⚠️ Task not found for update: %s", task.id)
 
     def add_event(self, event: Event):
         """Add an event to the fake event queue.
@@ -289,10 +295,19 @@ class InMemoryFakeAgentManager(ApplicationManager):
         Args:
             event: Event to add to the queue
         """
-        print(f"[InMemoryFakeAgentManager] 📢 Adding event: {event.id}")
-        self._events.append(event)
-        print(
-            f"[InMemoryFakeAgentManager] 📊 Total events: {len(self._events)}")
+        logger.debug("[InMemoryFakeAgentManager] 📢 Adding event: %s", event.id)
+        self._record_event(event.id, event.actor, event.content, event.timestamp)
+        logger.debug(
+            "[InMemoryFakeAgentManager] 📊 Total events: %s", len(self._event_ids))
+
+    def _record_event(
+        self, event_id: str, actor: str, content: Message, timestamp: float
+    ):
+        self._event_ids.append(event_id)
+        self._event_actors.append(actor)
+        self._event_contents.append(content)
+        self._event_timestamps.append(timestamp)
+        self._version += 1
 
     def next_message(self) -> Message:
         """Get the next fake message from the predefined queue.
@@ -301,17 +316,16 @@ class InMemoryFakeAgentManager(ApplicationManager):
         Returns:
             Next message from the fake message queue
         """
-        print("[InMemoryFakeAgentManager] 🎭 Getting next fake message")
-        print(
-            f"[InMemoryFakeAgentManager] 🔢 Current index: {self._next_message_idx}")
+        logger.debug("[InMemoryFakeAgentManager] 🎭 Getting next fake message")
+        logger.debug(
+            "[InMemoryFakeAgentManager] 🔢 Current index: %s", self._next_message_idx)
 
         message = _message_queue[self._next_message_idx]
-        self._next_message_idx = (self._next_message_idx + 1) % len(
-            _message_queue
-        )
+        self._next_message_idx = (
+            self._next_message_idx + 1) % _MESSAGE_QUEUE_LEN
 
-        print(
-            f"[InMemoryFakeAgentManager] ✅ Returning fake message, next index: {self._next_message_idx}")
+        logger.debug(
+            "[InMemoryFakeAgentManager] ✅ Returning fake message, next index: %s", self._next_message_idx)
         return message
 
     def get_conversation(
@@ -326,24 +340,18 @@ class InMemoryFakeAgentManager(ApplicationManager):
             Conversation object if found, None otherwise
         """
         if not conversation_id:
-            print("[InMemoryFakeAgentManager] ⚠️ No conversation ID provided")
+            logger.debug("[InMemoryFakeAgentManager] ⚠️ No conversation ID provided")
             return None
 
-        print(
-            f"[InMemoryFakeAgentManager] 🔍 Looking for conversation: {conversation_id}")
+        logger.debug(
+            "[InMemoryFakeAgentManager] 🔍 Looking for conversation: %s", conversation_id)
 
-        conversation = next(
-            filter(
-                lambda c: c and c.conversation_id == conversation_id,
-                self._conversations,
-            ),
-            None,
-        )
+        conversation = self._conversations_by_id.get(conversation_id)
 
         if conversation:
-            print("[InMemoryFakeAgentManager] ✅ Found conversation")
+            logger.debug("[InMemoryFakeAgentManager] ✅ Found conversation")
         else:
-            print("[InMemoryFakeAgentManager] ❌ Conversation not found")
+            logger.debug("[InMemoryFakeAgentManager] ❌ Conversation not found")
 
         return conversation
 
@@ -354,71 +362,58 @@ class InMemoryFakeAgentManager(ApplicationManager):
         Returns:
             List of tuples containing (message_id, status_text)
         """
-        print("[InMemoryFakeAgentManager] 📋 Getting pending messages")
-        print(
-            f"[InMemoryFakeAgentManager] 📊 Pending count: {len(self._pending_message_ids)}")
+        logger.debug("[InMemoryFakeAgentManager] 📋 Getting pending messages")
+        logger.debug(
+            "[InMemoryFakeAgentManager] 📊 Pending count: %s", len(self._pending_message_ids))
 
+        task_map = self._task_map
+        tasks_by_id = self._tasks_by_id
         rval: list[tuple[str, str]] = []
-        for message_id in self._pending_message_ids:
-            print(
-                f"[InMemoryFakeAgentManager] 🔍 Processing pending message: {message_id}")
-
-            if message_id in self._task_map:
-                task_id = self._task_map[message_id]
-                print(
-                    f"[InMemoryFakeAgentManager] 📋 Found task mapping: {task_id}")
-
-                task = next(
-                    filter(lambda x: x.id == task_id, self._tasks), None
-                )
-
-                if not task:
-                    rval.append((message_id, ''))
-                elif task.history and task.history[-1].parts:
-                    if len(task.history) == 1:
-                        rval.append((message_id, 'Working...'))
-                    else:
-                        part = task.history[-1].parts[0]
-                        status_text = (
-                            part.root.text
-                            if part.root.kind == 'text'
-                            else 'Working...'
-                        )
-                        rval.append((message_id, status_text))
-                else:
-                    rval.append((message_id, ''))
-            else:
+        for message_id in list(self._pending_message_ids):
+            task_id = task_map.get(message_id)
+            task = tasks_by_id.get(task_id) if task_id else None
+            if not task:
                 rval.append((message_id, ''))
+                continue
+            history = task.history
+            if not history or not history[-1].parts:
+                rval.append((message_id, ''))
+                continue
+            if len(history) == 1:
+                rval.append((message_id, 'Working...'))
+                continue
+            part = history[-1].parts[0].root
+            rval.append(
+                (message_id, part.text if part.kind == 'text' else 'Working...'))
 
         # Note: Original code had an early return here, which seems like a bug
         # We'll return the full list instead
         return rval
 
-    def register_agent(self, url):
+    async def register_agent(self, url):
         """Register a fake agent for testing purposes.
         Resolves agent card and adds to available agents list.
 
         Args:
             url: URL of the agent to register
         """
-        print(f"[InMemoryFakeAgentManager] 🔗 Registering fake agent: {url}")
+        logger.debug("[InMemoryFakeAgentManager] 🔗 Registering fake agent: %s", url)
 
         try:
-            agent_data = get_agent_card(url)
+            agent_data = await get_agent_card_async(url)
             if not agent_data.url:
                 agent_data.url = url
-                print(f"[InMemoryFakeAgentManager] 🔧 Set agent URL: {url}")
+                logger.debug("[InMemoryFakeAgentManager] 🔧 Set agent URL: %s", url)
 
             self._agents.append(agent_data)
-            print("[InMemoryFakeAgentManager] ✅ Agent registered successfully")
-            print(
-                f"[InMemoryFakeAgentManager] 🤖 Agent name: {agent_data.name}")
-            print(
-                f"[InMemoryFakeAgentManager] 📊 Total agents: {len(self._agents)}")
+            self._version += 1
+            logger.debug("[InMemoryFakeAgentManager] ✅ Agent registered successfully")
+            logger.debug("[InMemoryFakeAgentManager] 🤖 Agent name: %s", agent_data.name)
+            logger.debug(
+                "[InMemoryFakeAgentManager] 📊 Total agents: %s", len(self._agents))
 
         except Exception as e:
-            print(
-                f"[InMemoryFakeAgentManager] ❌ Failed to register agent: {e!s}")
+            logger.error("[InMemoryFakeAgentManager] ❌ Failed to register agent: %s", e)
             raise
 
     @property
@@ -435,7 +430,27 @@ class InMemoryFakeAgentManager(ApplicationManager):
 
     @property
     def events(self) -> list[Event]:
-        return []
+        return [
+            Event(id=i, actor=a, content=c, timestamp=t)
+            for i, a, c, t in zip(
+                self._event_ids,
+                self._event_actors,
+                self._event_contents,
+                self._event_timestamps,
+            )
+        ]
+
+
+def _submitted_task(task_id: str, context_id: str, message: Message) -> Task:
+    return Task(
+        id=task_id,
+        contextId=context_id,
+        status=TaskStatus(
+            state=TaskState.submitted,
+            message=message,
+        ),
+        history=[message],
+    )
 
 
 _contextId = str(uuid.uuid4())
@@ -497,3 +512,5 @@ _message_queue: list[Message] = [
         messageId=str(uuid.uuid4()),
     ),
 ]
+
+_MESSAGE_QUEUE_LEN = len(_message_queue)
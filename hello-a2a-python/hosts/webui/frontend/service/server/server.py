@@ -1,15 +1,15 @@
 import asyncio
 import base64
-import json
 import logging
 import os
-import threading
 import uuid
 
+from collections import OrderedDict
 from datetime import datetime
 from typing import Any
 
 import httpx
+import orjson
 
 from a2a.types import FilePart, FileWithUri, Message, Part
 from fastapi import FastAPI, Request, Response
@@ -35,6 +35,9 @@ from .in_memory_manager import InMemoryFakeAgentManager
 # Enhanced logging setup
 logger = logging.getLogger(__name__)
 
+# Upper bound on cached files / message views kept for the UI (LRU eviction)
+_MAX_CACHED_FILES = int(os.environ.get('A2A_UI_MAX_CACHED_FILES', '1000'))
+
 
 class WebUIFlowLogger:
     """简洁的WebUI流程日志记录器"""
@@ -42,22 +45,22 @@ class WebUIFlowLogger:
     @staticmethod
     def log_user_request_start(correlation_id: str, message: Message):
         """记录用户请求开始"""
-        logger.info(f"🚀 用户请求开始: ID:{correlation_id[:8]} | 消息:{message.messageId}")
+        logger.info("🚀 用户请求开始: ID:%s | 消息:%s", correlation_id[:8], message.messageId)
 
     @staticmethod
     def log_request_delegated_to_manager(correlation_id: str, manager_type: str, background_processing: bool):
         """记录请求委托给管理器"""
-        logger.info(f"📤 请求委托: {manager_type} | ID:{correlation_id[:8]} | 后台:{background_processing}")
+        logger.info("📤 请求委托: %s | ID:%s | 后台:%s", manager_type, correlation_id[:8], background_processing)
 
     @staticmethod
     def log_immediate_response_sent(correlation_id: str, response_info: MessageInfo):
         """记录立即响应"""
-        logger.info(f"↩️ 立即响应: ID:{correlation_id[:8]} | 响应:{response_info.message_id}")
+        logger.info("↩️ 立即响应: ID:%s | 响应:%s", correlation_id[:8], response_info.message_id)
 
     @staticmethod
     def log_error(correlation_id: str, error: str, context: dict[str, Any] | None = None):
         """记录错误"""
-        logger.error(f"❌ 流程错误: ID:{correlation_id[:8]} | {error}")
+        logger.error("❌ 流程错误: ID:%s | %s", correlation_id[:8], error)
 
 
 class ConversationServer:
@@ -65,6 +68,10 @@ class ConversationServer:
 
     This defines the interface that is used by the Mesop system to interact with
     agents and provide details about the executions.
+
+    Responses are assembled from models the managers already hold, so they are
+    built with model_construct and skip re-validation; only inbound request
+    bodies are validated.
     """
 
     def __init__(self, app: FastAPI, http_client: httpx.AsyncClient):
@@ -85,10 +92,21 @@ class ConversationServer:
             )
         else:
             self.manager = InMemoryFakeAgentManager()
-        # dict[str, FilePart] maps file id to message data
-        self._file_cache = {}
-        # dict[str, str] maps message id to cache id
-        self._message_to_cache = {}
+        # file id -> inline file part, replaced by (content, mime type) once
+        # decoded on first download. All three caches are LRU-bounded by
+        # _MAX_CACHED_FILES.
+        self._file_cache: OrderedDict[
+            str, FilePart | tuple[bytes | str, str]] = OrderedDict()
+        # message part id -> cache id
+        self._message_to_cache: OrderedDict[str, str] = OrderedDict()
+        # message id -> (source message, message with file parts replaced by
+        # urls, cache ids referenced by the view)
+        self._cached_message_view: OrderedDict[
+            str, tuple[Message, Message, tuple[str, ...]]] = OrderedDict()
+        # in-flight process_message tasks
+        self._background_tasks: set[asyncio.Task] = set()
+        # endpoint name -> (manager version, serialized response body)
+        self._list_cache: dict[str, tuple[int, str]] = {}
 
         app.add_api_route(
             '/conversation/create', self._create_conversation, methods=['POST']
@@ -124,7 +142,7 @@ class ConversationServer:
 
     async def _create_conversation(self):
         c = await self.manager.create_conversation()
-        return CreateConversationResponse(result=c)
+        return CreateConversationResponse.model_construct(result=c)
 
     async def _send_message(self, request: Request):
         """Handle incoming message from Web Interface.
@@ -137,24 +155,25 @@ class ConversationServer:
         4. Return immediate response while processing continues in background
         """
         # Generate correlation ID for complete flow tracking
-        correlation_id = str(uuid.uuid4())
+        correlation_id = uuid.uuid4().hex
 
         try:
-            print("[ConversationServer] 📨 Received message request from Web Interface")
+            logger.debug(
+                "[ConversationServer] 📨 Received message request from Web Interface")
 
-            message_data = await request.json()
-            print("[ConversationServer] 📋 Parsing message data")
+            message_data = orjson.loads(await request.body())
+            logger.debug("[ConversationServer] 📋 Parsing message data")
 
             # Parse message from JSON request
-            message = Message(**message_data['params'])
+            message = Message.model_validate(message_data['params'])
 
             # Log user request start
             WebUIFlowLogger.log_user_request_start(correlation_id, message)
 
             # Sanitize and validate the message through manager
             message = self.manager.sanitize_message(message)
-            print(
-                f"[WebUIFlow:{correlation_id}] 🧹 Message sanitized and validated")
+            logger.debug(
+                "[WebUIFlow:%s] 🧹 Message sanitized and validated", correlation_id)
 
             # Pass correlation ID to manager for complete flow tracking
             manager_type = type(self.manager).__name__
@@ -166,27 +185,15 @@ class ConversationServer:
                 background_processing=True
             )
 
-            # Start message processing in background thread to avoid blocking the UI
-            print(
-                f"[WebUIFlow:{correlation_id}] 🚀 Starting background message processing thread")
-
-            # Create a wrapper function to pass correlation_id to process_message
-            def background_processing():
-                # Set correlation ID in the message context for downstream tracking
-                if hasattr(message, '__dict__'):
-                    message.__dict__['_correlation_id'] = correlation_id
-
-                # Call with keyword argument
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    loop.run_until_complete(
-                        self.manager.process_message(message, correlation_id))
-                finally:
-                    loop.close()
-
-            t = threading.Thread(target=background_processing)
-            t.start()
+            # Start message processing as a background task on the server loop
+            # to avoid blocking the UI
+            logger.debug(
+                "[WebUIFlow:%s] 🚀 Starting background message processing task", correlation_id)
+            task = asyncio.create_task(
+                self.manager.process_message(message, correlation_id))
+            # Keep a reference so the task is not garbage collected mid-flight
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
 
             # Return immediate response to UI while processing continues
             response_info = MessageInfo(
@@ -198,7 +205,7 @@ class ConversationServer:
             WebUIFlowLogger.log_immediate_response_sent(
                 correlation_id, response_info)
 
-            return SendMessageResponse(result=response_info)
+            return SendMessageResponse.model_construct(result=response_info)
 
         except Exception as e:
             # Log error in WebUI flow
@@ -211,15 +218,15 @@ class ConversationServer:
             raise
 
     async def _list_messages(self, request: Request):
-        message_data = await request.json()
+        message_data = orjson.loads(await request.body())
         conversation_id = message_data['params']
 
         conversation = self.manager.get_conversation(conversation_id)
         if conversation:
             cached_messages = self.cache_content(conversation.messages)
-            return ListMessageResponse(result=cached_messages)
+            return ListMessageResponse.model_construct(result=cached_messages)
 
-        return ListMessageResponse(result=[])
+        return ListMessageResponse.model_construct(result=[])
 
     def cache_content(self, messages: list[Message]):
         rval = []
@@ -228,18 +235,31 @@ class ConversationServer:
             if not message_id:
                 rval.append(m)
                 continue
+            cached = self._cached_message_view.get(message_id)
+            # Reuse the view unless one of its files has since been evicted
+            if (cached is not None and cached[0] is m
+                    and all(c in self._file_cache for c in cached[2])):
+                self._cached_message_view.move_to_end(message_id)
+                for c in cached[2]:
+                    self._file_cache.move_to_end(c)
+                rval.append(cached[1])
+                continue
             new_parts: list[Part] = []
+            cache_ids: list[str] = []
             for i, p in enumerate(m.parts):
                 part = p.root
-                if part.kind != 'file':
+                # Parts that already reference a url are served as-is
+                if part.kind != 'file' or isinstance(part.file, FileWithUri):
                     new_parts.append(p)
                     continue
                 message_part_id = f'{message_id}:{i}'
                 if message_part_id in self._message_to_cache:
                     cache_id = self._message_to_cache[message_part_id]
+                    self._message_to_cache.move_to_end(message_part_id)
                 else:
-                    cache_id = str(uuid.uuid4())
-                    self._message_to_cache[message_part_id] = cache_id
+                    cache_id = uuid.uuid4().hex
+                    _lru_put(self._message_to_cache, message_part_id, cache_id)
+                cache_ids.append(cache_id)
                 # Replace the part data with a url reference
                 new_parts.append(
                     Part(
@@ -251,52 +271,81 @@ class ConversationServer:
                         )
                     )
                 )
-                if cache_id not in self._file_cache:
-                    self._file_cache[cache_id] = part
-            m.parts = new_parts
-            rval.append(m)
+                if cache_id in self._file_cache:
+                    self._file_cache.move_to_end(cache_id)
+                else:
+                    # Decoded lazily on first download, so a bad payload only
+                    # fails that file request, not the message list
+                    _lru_put(self._file_cache, cache_id, part)
+            # Leave the stored message untouched; hand out a copy with url parts
+            view = (m.model_copy(update={'parts': new_parts}) if cache_ids
+                    else m)
+            _lru_put(self._cached_message_view, message_id,
+                     (m, view, tuple(cache_ids)))
+            rval.append(view)
         return rval
 
     async def _pending_messages(self):
         pending_messages = self.manager.get_pending_messages()
-        return PendingMessageResponse(result=pending_messages)
+        return PendingMessageResponse.model_construct(result=pending_messages)
+
+    def _cached_list(self, name: str, build) -> Response:
+        """Serve a polled list endpoint, re-serializing only after a change."""
+        version = self.manager.version
+        cached = self._list_cache.get(name)
+        if cached is None or cached[0] != version:
+            cached = (version, build().model_dump_json(by_alias=True))
+            self._list_cache[name] = cached
+        return Response(content=cached[1], media_type='application/json')
 
     def _list_conversation(self):
-        conversations = self.manager.conversations
-        return ListConversationResponse(result=conversations)
+        return self._cached_list(
+            'conversations',
+            lambda: ListConversationResponse.model_construct(
+                result=self.manager.conversations
+            ),
+        )
 
     def _get_events(self):
-        events = self.manager.events
-        return GetEventResponse(result=events)
+        return self._cached_list(
+            'events',
+            lambda: GetEventResponse.model_construct(result=self.manager.events),
+        )
 
     def _list_tasks(self):
-        tasks = self.manager.tasks
-        return ListTaskResponse(result=tasks)
+        return self._cached_list(
+            'tasks',
+            lambda: ListTaskResponse.model_construct(result=self.manager.tasks),
+        )
 
     async def _register_agent(self, request: Request):
-        message_data = await request.json()
+        message_data = orjson.loads(await request.body())
         url = message_data['params']
-        self.manager.register_agent(url)
-        return RegisterAgentResponse()
+        await self.manager.register_agent(url)
+        return RegisterAgentResponse.model_construct()
 
     async def _list_agents(self):
-        return ListAgentResponse(result=self.manager.agents)
+        return self._cached_list(
+            'agents',
+            lambda: ListAgentResponse.model_construct(result=self.manager.agents),
+        )
 
     def _files(self, file_id):
-        if file_id not in self._file_cache:
+        entry = self._file_cache.get(file_id)
+        if entry is None:
             raise Exception('file not found')
-        part = self._file_cache[file_id]
-        if 'image' in part.file.mimeType:
-            return Response(
-                content=base64.b64decode(part.file.bytes),
-                media_type=part.file.mimeType,
-            )
-        return Response(content=part.file.bytes, media_type=part.file.mimeType)
+        self._file_cache.move_to_end(file_id)
+        if isinstance(entry, FilePart):
+            # First download: decode once and keep the result
+            entry = _file_content(entry)
+            self._file_cache[file_id] = entry
+        content, media_type = entry
+        return Response(content=content, media_type=media_type)
 
     async def _update_api_key(self, request: Request):
         """Update the API key"""
         try:
-            data = await request.json()
+            data = orjson.loads(await request.body())
             api_key = data.get('api_key', '')
 
             if api_key:
@@ -306,3 +355,17 @@ class ConversationServer:
             return {'status': 'error', 'message': 'No API key provided'}
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
+
+
+def _file_content(part: FilePart) -> tuple[bytes | str, str]:
+    """Response body and media type served for a cached file part."""
+    if 'image' in part.file.mimeType:
+        return base64.b64decode(part.file.bytes), part.file.mimeType
+    return part.file.bytes, part.file.mimeType
+
+
+def _lru_put(cache: OrderedDict, key: str, value: Any) -> None:
+    """Insert as most recently used, evicting the oldest entry past the cap."""
+    cache[key] = value
+    if len(cache) > _MAX_CACHED_FILES:
+        cache.popitem(last=False)
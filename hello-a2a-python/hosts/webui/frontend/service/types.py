@@ -1,4 +1,4 @@
-from typing import Annotated, Any, Literal
+from typing import Any, Literal
 from uuid import uuid4
 
 from a2a.types import (
@@ -6,11 +6,14 @@ from a2a.types import (
     Message,
     Task,
 )
-from pydantic import BaseModel, Field, TypeAdapter
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class JSONRPCMessage(BaseModel):
     """JSON-RPC消息基类"""
+    # 请求/响应构造后即不再修改，冻结以防误改
+    model_config = ConfigDict(frozen=True)
+
     jsonrpc: Literal['2.0'] = '2.0'
     id: int | str | None = Field(default_factory=lambda: uuid4().hex)
 
@@ -45,6 +48,8 @@ class Conversation(BaseModel):
 
 class Event(BaseModel):
     """事件模型"""
+    model_config = ConfigDict(frozen=True)
+
     id: str  # 事件唯一标识符
     actor: str = ''  # 事件发起者
     # TODO: 扩展支持模型内部概念，如函数调用
@@ -72,6 +77,8 @@ class ListMessageResponse(JSONRPCResponse):
 
 class MessageInfo(BaseModel):
     """消息信息"""
+    model_config = ConfigDict(frozen=True)
+
     message_id: str  # 消息ID
     context_id: str  # 上下文ID
 
@@ -153,12 +160,29 @@ class ListAgentResponse(JSONRPCResponse):
     result: list[AgentCard] | None = None
 
 
-AgentRequest = TypeAdapter(
-    Annotated[
-        SendMessageRequest | ListConversationRequest,
-        Field(discriminator='method'),
-    ]
-)
+# 按method字段直接分派到请求模型，避免联合类型判别器的开销
+_METHOD_MODELS: dict[str, type[JSONRPCRequest]] = {
+    model.model_fields['method'].default: model
+    for model in (
+        SendMessageRequest,
+        ListMessageRequest,
+        GetEventRequest,
+        ListConversationRequest,
+        PendingMessageRequest,
+        CreateConversationRequest,
+        ListTaskRequest,
+        RegisterAgentRequest,
+        ListAgentRequest,
+    )
+}
+
+
+def parse_agent_request(payload: dict[str, Any]) -> JSONRPCRequest:
+    """按method解析JSON-RPC请求"""
+    model = _METHOD_MODELS.get(payload.get('method'))
+    if model is None:
+        raise ValueError(f"Unknown method: {payload.get('method')}")
+    return model.model_validate(payload)
 
 
 class AgentClientError(Exception):
@@ -1,3 +1,5 @@
+import dataclasses
+
 import mesop as me
 
 
@@ -9,8 +11,8 @@ class AgentState:
     agent_address: str = ''  # 智能体地址
     agent_name: str = ''  # 智能体名称
     agent_description: str = ''  # 智能体描述
-    input_modes: list[str]  # 支持的输入模式
-    output_modes: list[str]  # 支持的输出模式
+    input_modes: list[str] = dataclasses.field(default_factory=list)  # 支持的输入模式
+    output_modes: list[str] = dataclasses.field(default_factory=list)  # 支持的输出模式
     stream_supported: bool = False  # 是否支持流式处理
     push_notifications_supported: bool = False  # 是否支持推送通知
     error: str = ''  # 错误信息
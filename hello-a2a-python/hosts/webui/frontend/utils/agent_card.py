@@ -1,15 +1,39 @@
+import httpx
 import requests
 
 from a2a.types import AgentCard
+from requests.adapters import HTTPAdapter
 
 
-def get_agent_card(remote_agent_address: str) -> AgentCard:
-    """Get the agent card."""
+# Shared connection pools so repeated card lookups reuse keep-alive connections
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+_session.mount('http://', _adapter)
+_session.mount('https://', _adapter)
+
+_async_client: httpx.AsyncClient | None = None
+
+
+def _agent_card_url(remote_agent_address: str) -> str:
     # Handle URLs with and without protocol
     if remote_agent_address.startswith(('http://', 'https://')):
-        url = f'{remote_agent_address}/.well-known/agent.json'
-    else:
-        url = f'http://{remote_agent_address}/.well-known/agent.json'
+        return f'{remote_agent_address}/.well-known/agent.json'
+    return f'http://{remote_agent_address}/.well-known/agent.json'
+
+
+def get_agent_card(remote_agent_address: str) -> AgentCard:
+    """Get the agent card."""
+    agent_card = _session.get(_agent_card_url(remote_agent_address))
+    return AgentCard(**agent_card.json())
+
 
-    agent_card = requests.get(url)
+async def get_agent_card_async(remote_agent_address: str) -> AgentCard:
+    """Get the agent card without blocking the event loop."""
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(
+            timeout=5.0,
+            limits=httpx.Limits(max_keepalive_connections=32),
+        )
+    agent_card = await _async_client.get(_agent_card_url(remote_agent_address))
     return AgentCard(**agent_card.json())
@@ -6,13 +6,18 @@ import re
 import traceback
 
 from collections.abc import AsyncIterable
+from dataclasses import dataclass
 from typing import Any, Literal
 
+import anyio
+import orjson
+
 from autogen import AssistantAgent, LLMConfig
 from autogen.mcp import create_toolkit
 from dotenv import load_dotenv
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from mcp.shared.exceptions import McpError
 from pydantic import BaseModel
 
 # Load environment variables
@@ -21,6 +26,28 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Patterns used on every response, compiled once
+_THINK_RE = re.compile(r'<think>.*?</think>', re.DOTALL)
+_YT_URL_RE = re.compile(
+    r'(?:https?://)?(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)([a-zA-Z0-9_-]+)'
+)
+_DECODER = json.JSONDecoder()
+
+# Errors that mean the MCP session itself is unusable, as opposed to a
+# failure in the LLM or in one particular request
+_MCP_ERRORS = (McpError, anyio.ClosedResourceError, anyio.BrokenResourceError)
+
+
+@dataclass
+class _MCPSession:
+    """A shared mcp-youtube session and the requests currently using it."""
+
+    closing: asyncio.Event
+    task: asyncio.Task | None = None
+    toolkit: Any = None
+    users: int = 0
+    stale: bool = False
+
 
 class ResponseModel(BaseModel):
     """Response model for the YouTube MCP agent."""
@@ -102,6 +129,29 @@ class YoutubeMCPAgent:
                 ),
             )
 
+            # Create stdio server parameters for mcp-youtube
+            # Use uv tool run for cross-platform compatibility
+            if os.name == 'nt':  # Windows
+                self._server_params = StdioServerParameters(
+                    command="uv",
+                    args=["tool", "run", "mcp-youtube", "run"],
+                )
+            else:  # Unix-like systems
+                mcp_path = os.path.expanduser(
+                    '~/.local/share/uv/tools/mcp-youtube/bin/mcp-youtube')
+                self._server_params = StdioServerParameters(
+                    command=mcp_path,
+                    args=["run"],  # Add the run subcommand for stdio mode
+                )
+
+            # 长驻的MCP会话：子进程与工具注册在多次stream()调用间复用。
+            # 会话因MCP/传输错误或超时失效后，待仍在使用它的请求全部结束再关闭，
+            # 新请求则启动新的会话
+            self._session: _MCPSession | None = None
+            self._session_lock = asyncio.Lock()
+            # 持有会话任务的引用，直到其退出
+            self._session_tasks: set[asyncio.Task] = set()
+
             self.initialized = True
             logger.info(
                 f'MCP智能体初始化成功 - 使用 {llm_provider} 提供商，模型: {model_name}')
@@ -112,11 +162,11 @@ class YoutubeMCPAgent:
     def get_agent_response(self, response: str) -> dict[str, Any]:
         """Format agent response in a consistent structure."""
         try:
-            # Extract JSON from response that may contain <think> tags or other text
-            json_response = self._extract_json_from_response(response)
+            # Extract and parse the JSON from response that may contain
+            # <think> tags or other text
+            response_dict = self._extract_json_from_response(response)
 
             # Try to parse the response as a ResponseModel JSON
-            response_dict = json.loads(json_response)
             model = ResponseModel(**response_dict)
 
             # Return only text_reply and closed_captions as JSON
@@ -129,7 +179,8 @@ class YoutubeMCPAgent:
             return {
                 'is_task_complete': True,
                 'require_user_input': False,
-                'content': json.dumps(clean_response, ensure_ascii=False, indent=2),
+                'content': orjson.dumps(
+                    clean_response, option=orjson.OPT_INDENT_2).decode(),
             }
         except Exception as e:
             # Log but continue with best-effort fallback
@@ -142,57 +193,28 @@ class YoutubeMCPAgent:
                 'content': response,
             }
 
-    def _extract_json_from_response(self, response: str) -> str:
-        """Extract JSON from response text that may contain <think> tags or other content."""
-        try:
-            # Remove <think> tags and everything between them
-            cleaned_response = re.sub(
-                r'<think>.*?</think>', '', response, flags=re.DOTALL).strip()
-
-            # If the cleaned response is empty, fall back to looking for JSON in the original
-            if not cleaned_response:
-                cleaned_response = response
-
-            # Look for JSON object boundaries in the cleaned response
-            start_idx = cleaned_response.find('{')
-            if start_idx == -1:
-                # No JSON found, return the cleaned response as-is
-                return cleaned_response
-
-            # Find the matching closing brace
-            brace_count = 0
-            end_idx = start_idx
-            for i, char in enumerate(cleaned_response[start_idx:], start_idx):
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        end_idx = i + 1
-                        break
-
-            # Extract the JSON part
-            json_part = cleaned_response[start_idx:end_idx]
-
-            # Verify it's valid JSON by attempting to parse it
-            json.loads(json_part)
-            return json_part
-
-        except (json.JSONDecodeError, ValueError, Exception) as e:
-            logger.debug(f"JSON extraction failed: {e}")
-            # If extraction fails, try to return just the text without <think> tags
-            try:
-                cleaned = re.sub(r'<think>.*?</think>', '',
-                                 response, flags=re.DOTALL).strip()
-                return cleaned if cleaned else response
-            except Exception:
-                return response
+    def _extract_json_from_response(self, response: str) -> Any:
+        """Parse the JSON object in response text that may contain <think> tags or other content."""
+        # Remove <think> tags and everything between them; if nothing is
+        # left, fall back to looking for JSON in the original. Most replies
+        # have no <think> block, so skip the regex pass for those.
+        if '<think>' not in response:
+            cleaned_response = response
+        else:
+            cleaned_response = _THINK_RE.sub('', response).strip() or response
+
+        # Decode the first JSON object; the C decoder finds where it ends
+        start_idx = cleaned_response.find('{')
+        if start_idx == -1:
+            # No JSON object found, try the cleaned response as-is
+            return orjson.loads(cleaned_response)
+        obj, _ = _DECODER.raw_decode(cleaned_response, start_idx)
+        return obj
 
     async def _provide_fallback_response(self, query: str, error_msg: str) -> str:
         """Provide fallback response when MCP server fails."""
         # Check if query contains a YouTube URL
-        youtube_url_pattern = r'(?:https?://)?(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)([a-zA-Z0-9_-]+)'
-        match = re.search(youtube_url_pattern, query)
+        match = _YT_URL_RE.search(query)
 
         if match:
             video_id = match.group(1)
@@ -200,6 +222,88 @@ class YoutubeMCPAgent:
         else:
             return f"I encountered an error while processing your request: {error_msg}\n\nPlease ensure you provide a valid YouTube URL and try again."
 
+    async def _acquire_session(self) -> _MCPSession:
+        """Return a live MCP session for one request, starting one if needed."""
+        async with self._session_lock:
+            session = self._session
+            if session is None or session.stale:
+                session = await self._start_session()
+                self._session = session
+            session.users += 1
+            return session
+
+    async def _start_session(self) -> _MCPSession:
+        ready = asyncio.get_running_loop().create_future()
+        session = _MCPSession(closing=asyncio.Event())
+        # The stdio/session contexts must be entered and exited by the same
+        # task, so a dedicated task owns them for the session's lifetime
+        session.task = asyncio.create_task(self._run_session(ready, session))
+        self._session_tasks.add(session.task)
+        session.task.add_done_callback(self._session_tasks.discard)
+        try:
+            session.toolkit = await ready
+        except BaseException:
+            # Startup failed, or the request gave up (e.g. timed out) while
+            # waiting: stop the task so its mcp-youtube subprocess goes away
+            session.task.cancel()
+            await asyncio.gather(session.task, return_exceptions=True)
+            raise
+        return session
+
+    def _release_session(self, session: _MCPSession, failed: bool) -> None:
+        """Drop one user of the session; close it once stale and unused."""
+        session.users -= 1
+        if failed:
+            session.stale = True
+        if session.stale and session.users == 0:
+            session.closing.set()
+            if self._session is session:
+                self._session = None
+
+    async def _run_session(
+        self, ready: asyncio.Future, session: _MCPSession
+    ) -> None:
+        """Keep an MCP session open until it is closed or fails."""
+        try:
+            # Connect to the MCP server using stdio client
+            async with (
+                stdio_client(self._server_params) as (read, write),
+                ClientSession(read, write) as client_session,
+            ):
+                # Initialize the connection
+                await client_session.initialize()
+                logger.info("MCP server connection initialized successfully")
+
+                # Create toolkit and register tools
+                toolkit = await create_toolkit(session=client_session)
+                logger.info(f"MCP toolkit created with {len(toolkit.tools)} tools")
+
+                if not toolkit.tools:
+                    raise ValueError("No tools available from MCP server")
+
+                toolkit.register_for_llm(self.agent)
+                logger.info("Tools registered for LLM")
+
+                # Log available tools for debugging
+                for tool in toolkit.tools:
+                    logger.info(f"Available tool: {tool.name} - {tool.description}")
+
+                if ready.done():
+                    # The waiting request gave up
+                    return
+                ready.set_result(toolkit)
+                await session.closing.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.error(f'MCP session closed with error: {e}')
+        finally:
+            # Whatever ended the session, later requests must start a new one
+            session.stale = True
+            if self._session is session:
+                self._session = None
+
     async def stream(
         self, query: str, sessionId: str
     ) -> AsyncIterable[dict[str, Any]]:
@@ -222,92 +326,57 @@ class YoutubeMCPAgent:
 
             logger.info(f'Processing query: {query[:50]}...')
 
+            session: _MCPSession | None = None
+            session_failed = False
             try:
-                # Create stdio server parameters for mcp-youtube
-                # Use uv tool run for cross-platform compatibility
-                if os.name == 'nt':  # Windows
-                    server_params = StdioServerParameters(
-                        command="uv",
-                        args=["tool", "run", "mcp-youtube", "run"],
-                    )
-                else:  # Unix-like systems
-                    mcp_path = os.path.expanduser(
-                        '~/.local/share/uv/tools/mcp-youtube/bin/mcp-youtube')
-                    server_params = StdioServerParameters(
-                        command=mcp_path,
-                        args=["run"],  # Add the run subcommand for stdio mode
-                    )
-
                 # Use asyncio.timeout to prevent hanging - 180 seconds for longer videos
                 async with asyncio.timeout(180):
-                    # Connect to the MCP server using stdio client
-                    async with (
-                        stdio_client(server_params) as (read, write),
-                        ClientSession(read, write) as session,
-                    ):
-                        # Initialize the connection
-                        await session.initialize()
-                        logger.info(
-                            "MCP server connection initialized successfully")
-
-                        # Create toolkit and register tools
-                        toolkit = await create_toolkit(session=session)
-                        logger.info(
-                            f"MCP toolkit created with {len(toolkit.tools)} tools")
-
-                        if not toolkit.tools:
-                            raise ValueError(
-                                "No tools available from MCP server")
-
-                        toolkit.register_for_llm(self.agent)
-                        logger.info("Tools registered for LLM")
-
-                        # Log available tools for debugging
-                        for tool in toolkit.tools:
-                            logger.info(
-                                f"Available tool: {tool.name} - {tool.description}")
-
-                        logger.info(
-                            f"Starting AG2 agent run with query: {query[:100]}...")
-
-                        result = await self.agent.a_run(
-                            message=query,
-                            tools=toolkit.tools,
-                            max_turns=8,  # Increased turns to ensure proper tool execution and final response
-                            user_input=False,
+                    session = await self._acquire_session()
+                    toolkit = session.toolkit
+                    logger.info(
+                        f"Starting AG2 agent run with query: {query[:100]}...")
+
+                    result = await self.agent.a_run(
+                        message=query,
+                        tools=toolkit.tools,
+                        max_turns=8,  # Increased turns to ensure proper tool execution and final response
+                        user_input=False,
+                    )
+
+                    # Debug: Log the result details
+                    logger.info(f"AG2 result type: {type(result)}")
+                    logger.info(
+                        f"AG2 result attributes: {[attr for attr in dir(result) if not attr.startswith('_')]}")
+
+                    # Process the result and get the response
+                    await result.process()
+                    logger.info("AG2 result processed successfully")
+
+                    # Get the summary which contains the output
+                    response = await result.summary
+                    if response is None or not response.strip():
+                        # If no summary, provide a helpful fallback
+                        logger.warning(
+                            "No summary available from AG2, using fallback")
+                        response = (
+                            "I successfully connected to the YouTube MCP server and "
+                            "executed the captions retrieval tool. However, the final "
+                            "summary was not generated properly. This may be due to "
+                            "the video having no available captions or other processing issues. "
+                            "Please try with a different YouTube video that has captions available."
                         )
 
-                        # Debug: Log the result details
-                        logger.info(f"AG2 result type: {type(result)}")
-                        logger.info(
-                            f"AG2 result attributes: {[attr for attr in dir(result) if not attr.startswith('_')]}")
-
-                        # Process the result and get the response
-                        await result.process()
-                        logger.info("AG2 result processed successfully")
-
-                        # Get the summary which contains the output
-                        response = await result.summary
-                        if response is None or not response.strip():
-                            # If no summary, provide a helpful fallback
-                            logger.warning(
-                                "No summary available from AG2, using fallback")
-                            response = (
-                                "I successfully connected to the YouTube MCP server and "
-                                "executed the captions retrieval tool. However, the final "
-                                "summary was not generated properly. This may be due to "
-                                "the video having no available captions or other processing issues. "
-                                "Please try with a different YouTube video that has captions available."
-                            )
-
-                        logger.info(
-                            f"Final response length: {len(response) if response else 0}")
-
-                        # Final response
-                        yield self.get_agent_response(response)
+                    logger.info(
+                        f"Final response length: {len(response) if response else 0}")
+
+                    # Final response
+                    yield self.get_agent_response(response)
 
             except asyncio.TimeoutError:
                 logger.error('Request timed out after 180 seconds')
+                # A hung tool call may have wedged the session; retire it once
+                # the other requests using it are done
+                session_failed = True
                 yield {
                     'is_task_complete': True,
                     'require_user_input': False,
@@ -318,6 +387,9 @@ class YoutubeMCPAgent:
                 logger.error(
                     f'Error during MCP processing: {traceback.format_exc()}'
                 )
+                # Only MCP/transport failures retire the shared session; LLM
+                # errors leave it to the other requests using it
+                session_failed = isinstance(e, _MCP_ERRORS)
 
                 # Try to extract video info and provide fallback response
                 fallback_response = await self._provide_fallback_response(query, str(e))
@@ -326,6 +398,9 @@ class YoutubeMCPAgent:
                     'require_user_input': False,
                     'content': fallback_response,
                 }
+            finally:
+                if session is not None:
+                    self._release_session(session, session_failed)
         except Exception as e:
             logger.error(f'Error in streaming agent: {traceback.format_exc()}')
             yield {
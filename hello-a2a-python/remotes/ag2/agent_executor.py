@@ -15,6 +15,17 @@ from .agent import YoutubeMCPAgent  # type: ignore[import-untyped]
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 流式循环中的事件字段都由本执行器生成，可信，跳过校验直接构造；
+# 若下游依赖校验时的类型转换，置为False即可恢复完整校验
+USE_FAST_CONSTRUCT = True
+
+
+def _make(model, **fields):
+    """构造事件模型，USE_FAST_CONSTRUCT时使用model_construct跳过校验"""
+    if USE_FAST_CONSTRUCT:
+        return model.model_construct(**fields)
+    return model(**fields)
+
 
 class AG2AgentExecutor(AgentExecutor):
     """Youtube MCP智能体的执行器。
@@ -67,60 +78,69 @@ class AG2AgentExecutor(AgentExecutor):
                 logger.error("无法创建任务：context.message为空")
                 return
 
+        # 任务ID和上下文ID在整个流中不变，循环前取出
+        task_id = task.id
+        context_id = task.contextId
+
         # 流式处理智能体响应
-        async for item in self.agent.stream(query, task.contextId):
+        async for item in self.agent.stream(query, context_id):
             is_task_complete = item['is_task_complete']
             require_user_input = item['require_user_input']
             content = item['content']
 
             logger.info(
-                f'📦 收到流式项目: 完成={is_task_complete}, 需要输入={require_user_input}, 内容长度={len(content)}'
+                '📦 收到流式项目: 完成=%s, 需要输入=%s, 内容长度=%d',
+                is_task_complete, require_user_input, len(content),
             )
 
             if not is_task_complete and not require_user_input:
                 # 任务进行中状态
                 logger.info("🔄 任务处理中，发送工作状态更新")
                 event_queue.enqueue_event(
-                    TaskStatusUpdateEvent(
-                        status=TaskStatus(
+                    _make(
+                        TaskStatusUpdateEvent,
+                        status=_make(
+                            TaskStatus,
                             state=TaskState.working,
                             message=new_agent_text_message(
                                 content,
-                                task.contextId,
-                                task.id,
+                                context_id,
+                                task_id,
                             ),
                         ),
                         final=False,
-                        contextId=task.contextId,
-                        taskId=task.id,
+                        contextId=context_id,
+                        taskId=task_id,
                     )
                 )
             elif require_user_input:
                 # 需要用户输入状态
                 logger.info("⏸️ 任务需要用户输入，发送输入请求状态")
                 event_queue.enqueue_event(
-                    TaskStatusUpdateEvent(
-                        status=TaskStatus(
+                    _make(
+                        TaskStatusUpdateEvent,
+                        status=_make(
+                            TaskStatus,
                             state=TaskState.input_required,
                             message=new_agent_text_message(
                                 content,
-                                task.contextId,
-                                task.id,
+                                context_id,
+                                task_id,
                             ),
                         ),
                         final=True,
-                        contextId=task.contextId,
-                        taskId=task.id,
+                        contextId=context_id,
+                        taskId=task_id,
                     )
                 )
             else:
-                # 任务完成状态
-                logger.info("✅ 任务完成，发送最终结果")
+                # 任务完成状态：先发送结果制品，再发送最终完成状态
                 event_queue.enqueue_event(
-                    TaskArtifactUpdateEvent(
+                    _make(
+                        TaskArtifactUpdateEvent,
                         append=False,
-                        contextId=task.contextId,
-                        taskId=task.id,
+                        contextId=context_id,
+                        taskId=task_id,
                         lastChunk=True,
                         artifact=new_text_artifact(
                             name='current_result',
@@ -130,14 +150,16 @@ class AG2AgentExecutor(AgentExecutor):
                     )
                 )
                 event_queue.enqueue_event(
-                    TaskStatusUpdateEvent(
-                        status=TaskStatus(state=TaskState.completed),
+                    _make(
+                        TaskStatusUpdateEvent,
+                        status=_make(TaskStatus, state=TaskState.completed),
                         final=True,
-                        contextId=task.contextId,
-                        taskId=task.id,
+                        contextId=context_id,
+                        taskId=task_id,
                     )
                 )
-                logger.info(f"🎉 AG2 YouTube字幕任务执行完成 - 任务ID: {task.id}")
+                logger.info(
+                    "🎉 AG2 YouTube字幕任务执行完成，已发送最终结果 - 任务ID: %s", task_id)
 
     async def cancel(
         self, context: RequestContext, event_queue: EventQueue
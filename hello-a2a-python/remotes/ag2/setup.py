@@ -15,6 +15,7 @@ setup(
         "autogen>=0.2.19",
         "python-dotenv>=1.0.0",
         "litellm>=1.16.9",
+        "orjson",
         "pydantic",
     ],
 )
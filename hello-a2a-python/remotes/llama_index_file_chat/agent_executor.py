@@ -155,8 +155,7 @@ class LlamaIndexAgentExecutor(AgentExecutor):
             logger.error(traceback.format_exc())
 
             # 出错时清理上下文
-            if context_id in self.ctx_states:
-                del self.ctx_states[context_id]
+            self.ctx_states.pop(context_id, None)
             raise ServerError(
                 error=InternalError(
                     message=f'流式响应处理错误: {e}'